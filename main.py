@@ -11,35 +11,86 @@ import time
 import json
 import threading
 import queue
-import copy
 import sys
 import os
 from datetime import timedelta
+from types import MappingProxyType, SimpleNamespace
 import contextlib
+import collections
+import heapq
+import itertools
+import functools
 import csv
 import math
+import re
+import hashlib
+import weakref
+import numpy as np
 
 # Check for optional libraries
+# Pillow and Matplotlib are heavy to import, so they are loaded on first use by _load_pil() / _ensure_matplotlib()
+Image = ImageTk = None
+Figure = FigureCanvasTkAgg = FontProperties = LineCollection = None
+_pil_checked = _matplotlib_checked = False
+
+
+def _load_pil():
+    """ Import Pillow on first use; returns False (and warns once) if it is not installed. """
+    global Image, ImageTk, _pil_checked
+    if not _pil_checked:
+        _pil_checked = True
+        try:
+            from PIL import Image, ImageTk
+        except ImportError:
+            Image = ImageTk = None
+            print("Warning: Pillow library not found. Icons will not be displayed. Please install with 'pip install Pillow'")
+    return ImageTk is not None
+
+
+def _ensure_matplotlib():
+    """ Import Matplotlib on first use; returns False (and warns once) if it is not installed. """
+    global Figure, FigureCanvasTkAgg, FontProperties, LineCollection, _matplotlib_checked
+    if not _matplotlib_checked:
+        _matplotlib_checked = True
+        try:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.font_manager import FontProperties
+            from matplotlib.collections import LineCollection
+        except ImportError:
+            Figure = FigureCanvasTkAgg = FontProperties = LineCollection = None
+            print(
+                "Warning: Matplotlib library not found. The plot panel will be disabled. Please install with 'pip install matplotlib'")
+    return FigureCanvasTkAgg is not None
+
+
+@functools.lru_cache(maxsize=16)
+def _font_properties(family, size, weight='normal'):
+    """ Shared FontProperties per (family, size, weight); text artists copy them, so sharing is safe. """
+    return FontProperties(family=family, size=size, weight=weight)
+
+
 try:
-    from PIL import Image, ImageTk, ImageOps
+    import orjson
 except ImportError:
-    ImageTk = None
-    print("Warning: Pillow library not found. Icons will not be displayed. Please install with 'pip install Pillow'")
+    orjson = None  # Optional accelerator; falls back to the standard json module
 
 try:
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    from matplotlib.font_manager import FontProperties
+    import ijson
 except ImportError:
-    FigureCanvasTkAgg = None
-    print(
-        "Warning: Matplotlib library not found. The plot panel will be disabled. Please install with 'pip install matplotlib'")
+    ijson = None  # Optional; sequence files are then parsed in one go with json.load
+
+try:
+    from tsdownsample import LTTBDownsampler
+except ImportError:
+    LTTBDownsampler = None  # Optional accelerator; the NumPy implementation below is used instead
 
 
 # --- Helper Functions & Constants ---
 
+@functools.lru_cache(maxsize=256)
 def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
+    """ Get absolute path to resource, works for dev and for PyInstaller (memoized; the base never changes at runtime) """
     try:
         base_path = sys._MEIPASS
     except AttributeError:
@@ -47,13 +98,111 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def clone_step(step):
+    """ Copy a sequence step; steps are flat dicts of scalars, so a shallow copy is an independent snapshot. """
+    return {k: (list(v) if isinstance(v, list) else v) for k, v in step.items()}
+
+
+def encode_json(obj, pretty=False):
+    """ Serialize obj to JSON bytes, using orjson when available; compact unless pretty is set. """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0))
+    return json.dumps(obj, indent=4 if pretty else None, separators=None if pretty else (',', ':')).encode('utf-8')
+
+
+def write_atomic(path, data):
+    """ Write bytes to path via a temp file + os.replace, so readers never see a half-written file. """
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def save_json(path, obj, pretty=False):
+    """ Write obj as JSON atomically, using orjson when available. """
+    write_atomic(path, encode_json(obj, pretty))
+
+
+def load_sequence_file(path):
+    """ Read a sequence file (a JSON list of steps), streaming it with ijson when installed to keep peak memory low. """
+    with open(path, 'rb') as f:
+        if ijson is None:
+            data = orjson.loads(f.read()) if orjson else json.load(f)
+        else:
+            head = f.read(64)
+            f.seek(0)
+            if not head.lstrip().startswith(b'['):
+                raise ValueError("Sequence file must contain a JSON list of steps.")
+            data = list(ijson.items(f, 'item', use_float=True))  # use_float: plain floats, not Decimal
+    if not isinstance(data, list):
+        raise ValueError("Sequence file must contain a JSON list of steps.")
+    return data
+
+
+@contextlib.contextmanager
+def _batched_updates(root, *frames):
+    """ Build a widget tree with pack propagation suspended on frames, then run a single layout pass. """
+    for frame in frames:
+        frame.pack_propagate(False)
+    try:
+        yield
+    finally:
+        for frame in frames:
+            frame.pack_propagate(True)
+        root.tk.call('update', 'idletasks')
+
+
+def load_config(path):
+    """ Parse a JSON config file, with orjson when it is available. """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def lttb_downsample(xs, ys, n_out=700):
+    """ Largest-Triangle-Three-Buckets downsampling of a polyline to at most n_out points. """
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    n = len(xs)
+    if n_out < 3 or n <= n_out:
+        return xs, ys
+    if LTTBDownsampler is not None:
+        idx = LTTBDownsampler().downsample(xs, ys, n_out=n_out)
+        return xs[idx], ys[idx]
+
+    # First and last points are always kept; the interior is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        next_end = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = xs[end:next_end].mean(), ys[end:next_end].mean()
+        px, py = xs[prev], ys[prev]
+        area = np.abs((px - avg_x) * (ys[start:end] - py) - (px - xs[start:end]) * (avg_y - py))
+        prev = start + int(np.argmax(area))
+        idx[b + 1] = prev
+    return xs[idx], ys[idx]
+
+
 CONFIG_FILE = "pump_controller_settings.json"
 BACKUP_FILE = "pump_controller_backup.json"
 ICON_SIZE = (20, 20)
 APP_VERSION = "3.2.0"
 
+# Pre-framed pump commands ('\n' + command + '\r'); R takes the speed in hundredths of an RPM
+CMD_RPM_TMPL = b'\nR%03d\r'
+CMD_FORWARD, CMD_REVERSE, CMD_HALT = b'\nK>\r', b'\nK<\r', b'\nKH\r'
+
+LIVE_PLOT_MAX_POINTS = 700  # 'Actual' line is LTTB-downsampled beyond this many samples
+LIVE_PLOT_RESAMPLE_STEP = 50  # New samples appended raw before the downsampled prefix is rebuilt
+LOG_MAX_LINES = 5000  # Entries kept in the log buffer, and roughly the lines kept in the log view
+UI_FLUSH_MS = 40  # Sequence worker progress/label/selection updates are applied at most this often
+LIVE_PLOT_FRAME_MS = 33  # Live 'Actual' line repaint interval (~30 fps), however fast samples arrive
+LIVE_PLOT_BUFFER_SIZE = 8192  # Samples kept per 'Actual' segment before the buffer thins itself by half
+
 # Constants for shear stress calculation
-CHAMBER_COEFFICIENTS = {
+CHAMBER_COEFFICIENTS = MappingProxyType({
     "µ-Slide I 0.2 Luer": 512.9,
     "µ-Slide I 0.2 Luer Glass Bottom": 330.4,
     "µ-Slide I 0.4 Luer": 131.6,
@@ -67,11 +216,179 @@ CHAMBER_COEFFICIENTS = {
     "µ-Slide VI 0.1": 10.7,
     "µ-Slide Membrane ibiPore Flow": 131.6,
     "µ-Slide I Luer 3D": 60.1,
-}
+})
 
 DEFAULT_VISCOSITY = 0.0070
 DEFAULT_TUBE_COEFFICIENT = 0.63
 DEFAULT_CHAMBER = "µ-Slide VI 0.4"
+_CHAMBER_NAMES = tuple(CHAMBER_COEFFICIENTS)
+
+# Combobox choices shared by the phase dialogs
+_DIRECTIONS = ("Forward", "Backward")
+_SPEED_MODES = ("Fixed", "Ramp")
+_TIME_UNITS = ("s", "min", "hr")
+_UNIT_SECONDS = MappingProxyType({"s": 1, "min": 60, "hr": 3600})
+_FLOW_KEYS = ('type', 'enabled', 'start_phase', 'end_phase', 'repeats')  # Step fields that decide execution order
+_LOG_LEVEL_TAGS = MappingProxyType({"ERROR": "error", "CONNECTION": "connection"})  # Text tags; other levels are "normal"
+
+# Pre-formatted dialog defaults, used as-is when there is no stored value to str()
+_PHASE_DEFAULTS = {"direction": "Forward", "mode": "Fixed", "rpm": "10.0", "duration": "60", "unit": "s",
+                   "update_interval": "1.0", "repeats": "3"}
+_SETTINGS_DEFAULTS = {"autosave_interval_min": "5", "tube_inner_diameter_mm": "1.0", "vol_per_rev_ul": "25.0",
+                      "dynamic_viscosity": str(DEFAULT_VISCOSITY), "tube_coefficient": str(DEFAULT_TUBE_COEFFICIENT)}
+
+
+# (result key, label) for each BatchEditDialog row, in grid order
+_BATCH_EDIT_ROWS = (('direction', 'Direction:'), ('speed_mode', 'Speed Mode:'), ('rpm', 'Target RPM:'),
+                    ('duration', 'Duration:'), ('unit', 'Unit:'))
+
+
+def _batch_rpm(value):
+    value = float(value)
+    if not (0 <= value <= 48): raise ValueError("RPM must be between 0-48.")
+    return value
+
+
+def _batch_duration(value):
+    value = float(value)
+    if value < 0: raise ValueError("Duration must be non-negative.")
+    return value
+
+
+# Converters for the numeric BatchEditDialog fields; other fields are stored as entered
+_BATCH_VALIDATORS = {"rpm": _batch_rpm, "duration": _batch_duration}
+
+
+def _step_seconds(step):
+    """ Duration of a Phase step in seconds. """
+    return step['duration'] * _UNIT_SECONDS.get(step['unit'], 1)
+
+
+def _step_profile(steps):
+    """ Per-step (start time, end time, start RPM, end RPM) arrays for steps run back to back from 0 RPM. """
+    durations = np.fromiter(map(_step_seconds, steps), dtype=float, count=len(steps))
+    rpm_end = np.fromiter((step['rpm'] for step in steps), dtype=float, count=len(steps))
+    t_end = np.cumsum(durations)
+    t_start = np.concatenate(([0.0], t_end[:-1]))
+    rpm_start = np.concatenate(([0.0], rpm_end[:-1]))
+    return t_start, t_end, rpm_start, rpm_end
+
+
+def _initial_text(data, key, defaults):
+    val = data.get(key)
+    return defaults[key] if val is None else str(val)
+
+
+class _SampleBuffer:
+    """ Fixed-capacity float32 (time, value) series. When full it drops every other sample and from then on keeps
+    only every 2nd (4th, ...) new one, so it spans the whole segment evenly however long a run is. The newest
+    sample is always present as the last point, so the live line never lags. """
+    __slots__ = ('_t', '_v', '_n', '_count', '_stride', '_tip_is_extra', 'generation')
+
+    def __init__(self, capacity=LIVE_PLOT_BUFFER_SIZE):
+        self._t = np.empty(capacity, dtype=np.float32)
+        self._v = np.empty(capacity, dtype=np.float32)
+        self._n = self._count = 0
+        self._stride = 1
+        self._tip_is_extra = False  # Last slot holds a sample off the stride grid, to be overwritten by the next one
+        self.generation = 0  # Bumped on every thinning, so index-based caches over the data know to reset
+
+    def __len__(self):
+        return self._n
+
+    def append(self, t, v):
+        if self._tip_is_extra:
+            self._n -= 1
+        elif self._n == len(self._t):
+            half = (self._n + 1) // 2
+            self._t[:half] = self._t[:self._n:2]
+            self._v[:half] = self._v[:self._n:2]
+            self._n = half
+            self._stride *= 2
+            self.generation += 1
+        self._t[self._n] = t
+        self._v[self._n] = v
+        self._n += 1
+        self._tip_is_extra = self._count % self._stride != 0
+        self._count += 1
+
+    @property
+    def times(self):
+        return self._t[:self._n]
+
+    @property
+    def values(self):
+        return self._v[:self._n]
+
+
+_icon_sources = {}
+_icon_cache = {}
+
+
+def _icon_source(filename, size):
+    """ Decode and resize an icon once; returns it as an RGBA uint8 array. """
+    key = (filename, size)
+    arr = _icon_sources.get(key)
+    if arr is None:
+        img = Image.open(resource_path(os.path.join('icons', filename)))
+        if size in img.info.get('sizes', ()):
+            img.size = size  # Multi-resolution .ico: decode the matching frame instead of resampling the largest
+        else:
+            img.draft('RGBA', size)  # Lets JPEG decode straight at a reduced scale; a no-op for PNG
+        img = img.convert("RGBA")
+        if img.size != size:
+            # Shrinking to icon size doesn't need LANCZOS; enlarging (the 16 px PNGs to ICON_SIZE) keeps it
+            shrink = img.width >= size[0] and img.height >= size[1]
+            img = img.resize(size, Image.BILINEAR if shrink else Image.LANCZOS, reducing_gap=2.0 if shrink else None)
+        arr = _icon_sources[key] = np.asarray(img)
+    return arr
+
+
+def get_icon(filename, size=ICON_SIZE, tint=None):
+    """ Shared PhotoImage for icons/<filename>, optionally tinted to an (r, g, b) colour; None without Pillow. """
+    key = (filename, size, tint)
+    photo = _icon_cache.get(key)
+    if photo is None:
+        if not _load_pil(): return None
+        arr = _icon_source(filename, size)
+        if tint is not None:
+            arr = arr.copy()
+            arr[..., :3] = tint  # Recolour in one vectorised assignment; the alpha channel keeps the shape
+        photo = _icon_cache[key] = ImageTk.PhotoImage(Image.fromarray(arr, 'RGBA'))
+    return photo
+
+
+ICON_MAP = MappingProxyType({
+    'new_file': 'file-earmark-plus.png', 'load': 'folder2-open.png', 'save': 'save.png',
+    'exit': 'box-arrow-right.png',
+    'light': 'sun.png', 'dark': 'moon-stars.png', 'help': 'question-circle.png', 'about': 'info-circle.png',
+    'add': 'plus-circle-dotted.png', 'cycle': 'arrow-repeat.png', 'edit': 'pencil-square.png',
+    'remove': 'trash.png', 'clear': 'x-octagon.png', 'up': 'arrow-up-circle.png',
+    'down': 'arrow-down-circle.png', 'copy': 'clipboard.png', 'paste': 'clipboard-plus.png',
+    'duplicate': 'files.png', 'play': 'play-circle.png', 'stop': 'stop-circle.png',
+    'refresh': 'arrow-clockwise.png', 'pause': 'pause-circle.png', 'settings': 'gear.png',
+    'template_add': 'bookmark-plus.png', 'template_load': 'bookmark-check.png',
+    'export_img': 'image.png', 'export_csv': 'file-earmark-ruled.png',
+    'batch_edit': 'pencil-fill.png', 'toggle_on': 'toggle-on.png', 'toggle_off': 'toggle-off.png'
+})
+
+
+class _LazyIconDict(dict):
+    """ Icon name -> PhotoImage (or None), decoded on first lookup in the current tint. """
+
+    def __init__(self, tint=(0, 0, 0)):
+        super().__init__()
+        self.tint = tint
+
+    def __missing__(self, name):
+        photo, filename = None, ICON_MAP.get(name)
+        if filename:
+            try:
+                photo = get_icon(filename, tint=self.tint)
+            except Exception as e:
+                print(f"Warning: Could not load icon '{filename}': {e}")
+        self[name] = photo
+        return photo
 
 
 # ==============================================================================
@@ -80,65 +397,177 @@ DEFAULT_CHAMBER = "µ-Slide VI 0.4"
 class MinipulsController:
     """ Handles all serial communication with the pump in a separate thread. """
 
-    def __init__(self, command_queue, result_queue):
+    def __init__(self, command_queue, result_queue, ui=None):
         self.command_queue, self.result_queue, self.ser, self.stop_thread = command_queue, result_queue, None, threading.Event()
+        self._cmd_cache = {}  # command_str -> framed bytes, so repeated commands are encoded only once
+        self._ui_ref = weakref.ref(ui) if ui is not None else None  # Weak, so the thread never keeps a closed window alive
+
+    def post_result(self, result):
+        """ Queue a result and wake the GUI with <<PumpResult>> instead of making it poll. """
+        self.result_queue.append(result)
+        ui = self._ui_ref() if self._ui_ref is not None else None
+        if ui is not None:
+            try:
+                ui.event_generate('<<PumpResult>>', when='tail')
+            except (tk.TclError, RuntimeError):
+                pass  # Window gone or mainloop not running yet; the GUI's fallback poll picks the result up
 
     def run(self):
-        while not self.stop_thread.is_set():
-            try:
-                command = self.command_queue.get(timeout=0.1)
-                action = command.get("action")
-                if action == "connect":
-                    self._connect(command)
-                elif action == "disconnect":
-                    self._disconnect()
-                elif action == "send_command":
-                    self._send_command(command.get("command_str"))
-                elif action == "stop_thread":
-                    self._disconnect()
-                    break
-            except queue.Empty:
-                continue
+        # Block until a command arrives; the GUI ends the loop with a {"action": "stop_thread"} sentinel.
+        # Items are (priority, seq, command). Only SK, disconnect and stop_thread are urgent (priority 0) and overtake
+        # queued writes; speed, direction and halt bytes stay in FIFO order, so a halt always lands after the writes
+        # queued before it.
+        while True:
+            _, _, command = self.command_queue.get()
+            action = command.get("action")
+            if action == "connect":
+                self._connect(command)
+            elif action == "disconnect":
+                self._disconnect()
+                self._drop_pending_sends()
+            elif action == "send_command":
+                self._send_command(command.get("command_str"))
+            elif action == "send_bytes":
+                self._send_bytes(command.get("data"))
+            elif action == "list_ports":
+                self._list_ports()
+            elif action == "stop_thread":
+                self._disconnect()
+                break
+            if self.stop_thread.is_set():
+                self._disconnect()
+                break
 
     def _connect(self, config):
         try:
             self.ser = serial.Serial(config["port"], config["baudrate"], bytesize=serial.EIGHTBITS,
-                                     parity=serial.PARITY_EVEN, stopbits=serial.STOPBITS_ONE, timeout=1)
-            self.ser.write(bytes([255]))
-            time.sleep(0.05)
+                                     parity=serial.PARITY_EVEN, stopbits=serial.STOPBITS_ONE, timeout=1,
+                                     write_timeout=0.2, exclusive=True)
+            self._enable_low_latency()
             connect_command = bytes([config["unit_id"] + 128])
-            self.ser.write(connect_command)
-            response = self.ser.read(1)
+            self.ser.reset_input_buffer()  # Drop any stale bytes; the read below synchronises on the echo
+            # Reset (255) and unit select in one write; the reply is the echoed unit-select byte
+            sent_ns = time.monotonic_ns()
+            self.ser.write(bytes([255]) + connect_command)
+            self.ser.flush()
+            response = self._read_exact(1, deadline_s=0.25)
+            if response != connect_command:
+                # Some pumps need a pause after the reset byte: retry the original two-step handshake
+                self.ser.reset_input_buffer()
+                self.ser.write(bytes([255]))
+                self.ser.flush()
+                time.sleep(0.05)
+                sent_ns = time.monotonic_ns()
+                self.ser.write(connect_command)
+                self.ser.flush()
+                response = self._read_exact(1, deadline_s=1.0)
+            ts = time.monotonic_ns()  # Stamped here, next to the read, not when the GUI gets round to it
             if response == connect_command:
-                self.result_queue.put(
-                    {"status": "connected", "msg": f"Successfully connected to pump (ID: {config['unit_id']})."})
+                self.post_result(
+                    {"status": "connected",
+                     "msg": f"Successfully connected to pump (ID: {config['unit_id']}, "
+                            f"handshake {(ts - sent_ns) * 1e-6:.1f} ms)."})
             else:
                 if self.ser: self.ser.close()
                 self.ser = None
-                self.result_queue.put({"status": "error",
-                                       "msg": f"Connection failed. Expected {connect_command.hex()} but received {response.hex()}"})
+                self.post_result({"status": "error",
+                                  "msg": f"Connection failed. Expected {connect_command.hex()} but received {response.hex()}"})
         except serial.SerialException as e:
             self.ser = None
-            self.result_queue.put({"status": "error", "msg": f"Connection Error: {e}"})
+            self.post_result({"status": "error", "msg": f"Connection Error: {e}"})
+
+    def _read_exact(self, n, deadline_s=0.2):
+        """ Read up to n bytes, polling in_waiting at 1 ms so a reply is picked up as soon as it lands. """
+        data = b''
+        t0 = time.monotonic()
+        try:
+            while len(data) < n and time.monotonic() - t0 < deadline_s:
+                waiting = self.ser.in_waiting
+                if waiting:
+                    data += self.ser.read(min(waiting, n - len(data)))
+                else:
+                    time.sleep(0.001)
+        except (AttributeError, OSError, serial.SerialException):
+            data += self.ser.read(n - len(data))  # Backend without in_waiting: rely on the port timeout
+        return data
+
+    def _enable_low_latency(self):
+        """ On Linux, set ASYNC_LOW_LATENCY so USB-serial adapters (FTDI etc.) hand over bytes without a 16 ms delay. """
+        if not sys.platform.startswith('linux'):
+            return
+        import array
+        import fcntl
+        TIOCGSERIAL, TIOCSSERIAL, ASYNC_LOW_LATENCY = 0x541E, 0x541F, 0x2000
+        try:
+            serial_struct = array.array('i', [0] * 32)
+            fcntl.ioctl(self.ser.fileno(), TIOCGSERIAL, serial_struct, True)
+            serial_struct[4] |= ASYNC_LOW_LATENCY  # 'flags' field of struct serial_struct
+            fcntl.ioctl(self.ser.fileno(), TIOCSSERIAL, serial_struct)
+        except OSError:
+            pass  # Not supported by every driver; the port still works with the default latency
 
     def _disconnect(self):
         if self.ser and self.ser.is_open:
             try:
                 self.ser.write(bytes([255]))
-                time.sleep(0.05)
+                self.ser.flush()
                 self.ser.close()
-                self.result_queue.put({"status": "disconnected", "msg": "Serial port closed."})
+                self.post_result({"status": "disconnected", "msg": "Serial port closed."})
             except Exception as e:
-                self.result_queue.put({"status": "error", "msg": f"Error during disconnect: {e}"})
+                self.post_result({"status": "error", "msg": f"Error during disconnect: {e}"})
         self.ser = None
 
+    def _drop_pending_sends(self):
+        """ Discard sends queued before an urgent disconnect overtook them; they would only fail against the closed
+        port. Sends queued behind a later connect are kept. """
+        q = self.command_queue
+        with q.mutex:
+            connects = [seq for _, seq, cmd in q.queue if cmd.get("action") == "connect"]
+            cutoff = min(connects, default=math.inf)
+            kept = [item for item in q.queue
+                    if not (item[1] < cutoff and item[2].get("action") in ("send_command", "send_bytes"))]
+            if len(kept) != len(q.queue):
+                q.queue[:] = kept
+                heapq.heapify(q.queue)
+
+    def _list_ports(self):
+        """ Enumerate serial devices here, off the Tk thread; this can take hundreds of ms on Windows. """
+        ports = []
+        try:
+            ports = [port.device for port in serial.tools.list_ports.comports()]
+        except Exception as e:  # Must not escape: it would end run() and strand every queued command
+            self.post_result({"status": "error", "msg": f"Port scan failed: {e}"})
+        finally:
+            self.post_result({"status": "ports", "ports": ports})  # Always ends the UI's pending scan
+
     def _send_command(self, command_str):
+        full_command = self._cmd_cache.get(command_str)
+        if full_command is None:
+            full_command = self._cmd_cache[command_str] = b'\n' + command_str.encode('ascii') + b'\r'
+        self._send_bytes(full_command)
+
+    def _send_bytes(self, full_command):
+        """ Write an already framed command (see the CMD_* templates) to the pump. """
         if self.ser and self.ser.is_open:
-            full_command = b'\n' + command_str.encode('ascii') + b'\r'
-            self.ser.write(full_command)
-            time.sleep(0.05)
+            try:
+                fd = getattr(self.ser, 'fd', None)  # Only the POSIX backend exposes a raw descriptor
+                if fd is not None:
+                    # The port is opened O_NONBLOCK, so a full TX buffer gives a short write or BlockingIOError;
+                    # hand the rest to pyserial, which waits up to write_timeout instead of dropping the command
+                    try:
+                        written = os.write(fd, full_command)
+                    except BlockingIOError:
+                        written = 0
+                    if written < len(full_command):
+                        self.ser.write(full_command[written:])
+                else:
+                    self.ser.write(full_command)
+                self.ser.flush()
+            except (serial.SerialException, OSError) as e:
+                self.post_result({"status": "error",
+                                  "msg": f"Failed to send command '{full_command.strip().decode('ascii', 'replace')}': {e}"})
         else:
-            self.result_queue.put({"status": "error", "msg": "Cannot send command: Pump not connected."})
+            self.post_result({"status": "error", "msg": "Cannot send command: Pump not connected."})
 
 
 # ==============================================================================
@@ -146,13 +575,17 @@ class MinipulsController:
 # ==============================================================================
 class CollapsibleFrame(tb.Frame):
     """ A custom collapsible frame widget. """
+    _ARROW_OPEN, _ARROW_CLOSED = "▼", "▶"
 
     def __init__(self, parent, text="", bootstyle=DEFAULT, **kwargs):
         super().__init__(parent, **kwargs)
         self.columnconfigure(0, weight=1)
         self.bootstyle = bootstyle
+        self._label = text
+        # Indexed by is_collapsed
+        self._labels = (f"{self._ARROW_OPEN} {text}", f"{self._ARROW_CLOSED} {text}")
 
-        self.toggle_button = tb.Button(self, text=f"▼ {text}", bootstyle=(bootstyle, "flat"), command=self.toggle)
+        self.toggle_button = tb.Button(self, text=self._labels[0], bootstyle=(bootstyle, "flat"), command=self.toggle)
         self.toggle_button.grid(row=0, column=0, sticky="ew")
 
         self.sub_frame = tb.Frame(self)
@@ -163,15 +596,99 @@ class CollapsibleFrame(tb.Frame):
         self.is_collapsed = not self.is_collapsed
         if self.is_collapsed:
             self.sub_frame.grid_remove()
-            self.toggle_button.config(text=self.toggle_button.cget('text').replace("▼", "▶"))
         else:
             self.sub_frame.grid()
-            self.toggle_button.config(text=self.toggle_button.cget('text').replace("▶", "▼"))
+        self.toggle_button.config(text=self._labels[self.is_collapsed])
+
+
+class ErrorPopup(tb.Toplevel):
+    """ A modal error box that is built once and withdrawn between uses instead of being recreated. """
+    _instance = None
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.withdraw()
+        self.resizable(False, False)
+        self.protocol("WM_DELETE_WINDOW", self._close)
+        self.bind("<Escape>", self._close)
+        self.bind("<Return>", self._close)
+        self.message = tk.StringVar(self)
+        self._closed = tk.BooleanVar(self, False)
+
+        body = tb.Frame(self, padding=15)
+        body.pack(fill=BOTH, expand=True)
+        self.icon_label = tb.Label(body)
+        self.icon_label.pack(side=LEFT, anchor=N, padx=(0, 10))
+        tb.Label(body, textvariable=self.message, wraplength=360, justify=LEFT).pack(side=LEFT, fill=BOTH, expand=True)
+        tb.Button(self, text="OK", command=self._close, bootstyle="danger", width=8).pack(pady=(0, 15))
+
+    @classmethod
+    def show_error(cls, parent, title, message):
+        """ Show message modally over parent, falling back to messagebox if the shared popup is unusable. """
+        try:
+            popup = cls._instance
+            if popup is None or not popup.winfo_exists():
+                popup = cls._instance = cls(parent._root())
+            popup._show(parent, title, message)
+        except tk.TclError:
+            messagebox.showerror(title, message, parent=parent)
+
+    def _show(self, parent, title, message):
+        self.title(title)
+        self.message.set(message)
+        icon = get_icon('x-octagon.png', tint=(220, 53, 69))
+        self.icon_label.config(image=icon or '')
+        self.transient(parent)
+        self.geometry(f"+{parent.winfo_rootx() + 80}+{parent.winfo_rooty() + 80}")
+        previous_grab = self.grab_current()
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self.focus_set()
+        self._closed.set(False)
+        self.wait_variable(self._closed)
+        self.grab_release()
+        self.withdraw()
+        if previous_grab is not None and previous_grab.winfo_exists():
+            previous_grab.grab_set()
+
+    def _close(self, event=None):
+        self._closed.set(True)
 
 
 # ==============================================================================
 # ## Dialog Windows ##
 # ==============================================================================
+# Partial-input patterns for key validation: also accept "", "-" and "1." while the user is typing
+_FLOAT_RE = re.compile(r'-?\d*\.?\d*')
+_INT_RE = re.compile(r'-?\d*')
+
+
+def _validate_float(val):
+    return _FLOAT_RE.fullmatch(val) is not None
+
+
+def _validate_int(val):
+    return _INT_RE.fullmatch(val) is not None
+
+
+_registered_validators = {}  # id(root) -> (float_cmd, int_cmd), registered once per Tk interpreter
+
+
+def _get_validators(root):
+    """ Tcl command names for the float/int key validators, registered on root the first time they are needed. """
+    key = id(root)
+    entry = _registered_validators.get(key)
+    if entry is None:
+        entry = _registered_validators[key] = (root.register(_validate_float), root.register(_validate_int))
+
+        def _evict(event):
+            if event.widget is root: _registered_validators.pop(key, None)
+
+        root.bind("<Destroy>", _evict, add="+")
+    return entry
+
+
 class BaseDialog(tb.Toplevel):
     """ A base class for dialogs with common validation logic. """
 
@@ -185,24 +702,9 @@ class BaseDialog(tb.Toplevel):
         self.protocol("WM_DELETE_WINDOW", self.on_cancel)
         self.bind("<Escape>", self.on_cancel)
 
-        self.vcmd_float = (self.register(self.validate_float), '%P')
-        self.vcmd_int = (self.register(self.validate_int), '%P')
-
-    def validate_float(self, val):
-        if val in ["", "-"]: return True
-        try:
-            float(val)
-            return True
-        except ValueError:
-            return False
-
-    def validate_int(self, val):
-        if val in ["", "-"]: return True
-        try:
-            int(val)
-            return True
-        except ValueError:
-            return False
+        float_cmd, int_cmd = _get_validators(self._root())
+        self.vcmd_float = (float_cmd, '%P')
+        self.vcmd_int = (int_cmd, '%P')
 
     def on_cancel(self, event=None):
         self.result = None
@@ -211,6 +713,15 @@ class BaseDialog(tb.Toplevel):
 
 class AddPhaseDialog(BaseDialog):
     """ Dialog to add or edit a sequence phase. """
+    # (label, control key, widget kind, combobox values) in grid-row order
+    _PHASE_ROWS = (
+        ("Direction:", "direction", "combo", _DIRECTIONS),
+        ("Speed Mode:", "speed_mode", "combo", _SPEED_MODES),
+        ("Target RPM:", "target_rpm", "float", None),
+        ("Duration:", "duration", "float", None),
+        ("Unit:", "unit", "combo", _TIME_UNITS),
+    )
+    _interval_row = len(_PHASE_ROWS)  # The Ramp-only update interval goes below the fixed rows
 
     def __init__(self, parent, initial_data=None):
         super().__init__(parent, title="Add/Edit Phase")
@@ -221,15 +732,11 @@ class AddPhaseDialog(BaseDialog):
         body.columnconfigure(1, weight=1)
 
         self.controls = {}
-        widgets_map = {
-            "Direction:": ("direction", tb.Combobox(body, values=["Forward", "Backward"], state="readonly")),
-            "Speed Mode:": ("speed_mode", tb.Combobox(body, values=["Fixed", "Ramp"], state="readonly")),
-            "Target RPM:": ("target_rpm", tb.Entry(body, validate="key", validatecommand=self.vcmd_float)),
-            "Duration:": ("duration", tb.Entry(body, validate="key", validatecommand=self.vcmd_float)),
-            "Unit:": ("unit", tb.Combobox(body, values=["s", "min", "hr"], state="readonly")),
-        }
-
-        for i, (text, (key, widget)) in enumerate(widgets_map.items()):
+        for i, (text, key, kind, values) in enumerate(self._PHASE_ROWS):
+            if kind == "combo":
+                widget = tb.Combobox(body, values=values, state="readonly")
+            else:
+                widget = tb.Entry(body, validate="key", validatecommand=self.vcmd_float)
             tb.Label(body, text=text).grid(row=i, column=0, sticky='w', pady=5)
             widget.grid(row=i, column=1, sticky='ew', pady=5, padx=5)
             self.controls[key] = widget
@@ -238,6 +745,7 @@ class AddPhaseDialog(BaseDialog):
         self.controls['update_interval'] = tb.Entry(body, validate="key", validatecommand=self.vcmd_float)
 
         self.controls['speed_mode'].bind("<<ComboboxSelected>>", self._toggle_interval_entry)
+        self._interval_visible = None  # Unknown until the first toggle lays the row out
 
         self._setup_tooltips()
         self._populate_initial_data()
@@ -262,17 +770,22 @@ class AddPhaseDialog(BaseDialog):
                 bootstyle="info")
 
     def _populate_initial_data(self):
-        self.controls['direction'].set(self.initial_data.get("direction", "Forward"))
-        self.controls['speed_mode'].set(self.initial_data.get("mode", "Fixed"))
-        self.controls['target_rpm'].insert(0, str(self.initial_data.get("rpm", 10.0)))
-        self.controls['duration'].insert(0, str(self.initial_data.get("duration", 60)))
-        self.controls['unit'].set(self.initial_data.get("unit", "s"))
-        self.controls['update_interval'].insert(0, str(self.initial_data.get("update_interval", 1.0)))
+        data = self.initial_data
+        self.controls['direction'].set(_initial_text(data, "direction", _PHASE_DEFAULTS))
+        self.controls['speed_mode'].set(_initial_text(data, "mode", _PHASE_DEFAULTS))
+        self.controls['target_rpm'].insert(0, _initial_text(data, "rpm", _PHASE_DEFAULTS))
+        self.controls['duration'].insert(0, _initial_text(data, "duration", _PHASE_DEFAULTS))
+        self.controls['unit'].set(_initial_text(data, "unit", _PHASE_DEFAULTS))
+        self.controls['update_interval'].insert(0, _initial_text(data, "update_interval", _PHASE_DEFAULTS))
 
     def _toggle_interval_entry(self, event=None):
-        if self.controls['speed_mode'].get() == "Ramp":
-            self.update_interval_label.grid(row=5, column=0, sticky='w', pady=5)
-            self.controls['update_interval'].grid(row=5, column=1, sticky='ew', pady=5, padx=5)
+        want = self.controls['speed_mode'].get() == "Ramp"
+        if want == self._interval_visible:
+            return  # Re-selecting the same mode needs no relayout
+        self._interval_visible = want
+        if want:
+            self.update_interval_label.grid(row=self._interval_row, column=0, sticky='w', pady=5)
+            self.controls['update_interval'].grid(row=self._interval_row, column=1, sticky='ew', pady=5, padx=5)
         else:
             self.update_interval_label.grid_remove()
             self.controls['update_interval'].grid_remove()
@@ -298,7 +811,7 @@ class AddPhaseDialog(BaseDialog):
                 self.result["update_interval"] = update_interval
             self.destroy()
         except Exception as e:
-            messagebox.showerror("Input Error", f"Please check all input values.\n\nDetails: {e}", parent=self)
+            ErrorPopup.show_error(self, "Input Error", f"Please check all input values.\n\nDetails: {e}")
 
 
 class AddCycleDialog(BaseDialog):
@@ -350,7 +863,7 @@ class AddCycleDialog(BaseDialog):
             start if start in self.phase_indices else (self.phase_indices[0] if self.phase_indices else 1))
         end = self.initial_data.get("end_phase", self.phase_indices[-1] if self.phase_indices else 1)
         self.end_cb.set(end if end in self.phase_indices else (self.phase_indices[-1] if self.phase_indices else 1))
-        self.repeats_entry.insert(0, str(self.initial_data.get("repeats", 3)))
+        self.repeats_entry.insert(0, _initial_text(self.initial_data, "repeats", _PHASE_DEFAULTS))
 
     def on_ok(self):
         try:
@@ -360,9 +873,8 @@ class AddCycleDialog(BaseDialog):
                            "enabled": self.initial_data.get("enabled", True)}
             self.destroy()
         except Exception as e:
-            messagebox.showerror("Input Error",
-                                 f"Please check all values.\nEnd Phase must be >= Start Phase.\n\nDetails: {e}",
-                                 parent=self)
+            ErrorPopup.show_error(self, "Input Error",
+                                  f"Please check all values.\nEnd Phase must be >= Start Phase.\n\nDetails: {e}")
 
 
 class BatchEditDialog(BaseDialog):
@@ -376,44 +888,20 @@ class BatchEditDialog(BaseDialog):
         body.pack(fill=BOTH, expand=True)
         body.columnconfigure(1, weight=1)
 
-        self.vars = {key: tk.BooleanVar() for key in ['direction', 'speed_mode', 'rpm', 'duration', 'unit']}
+        self.vars = {key: tk.BooleanVar() for key, _ in _BATCH_EDIT_ROWS}
         self.controls = {}
 
-        # Direction
-        f1 = tb.Frame(body)
-        f1.grid(row=0, column=1, sticky='ew', pady=5, padx=5)
-        self.controls['direction'] = tb.Combobox(f1, values=["Forward", "Backward"], state="readonly", width=10)
-        self.controls['direction'].pack(side=LEFT, fill=X, expand=True)
-
-        # Speed Mode
-        f2 = tb.Frame(body)
-        f2.grid(row=1, column=1, sticky='ew', pady=5, padx=5)
-        self.controls['speed_mode'] = tb.Combobox(f2, values=["Fixed", "Ramp"], state="readonly", width=10)
-        self.controls['speed_mode'].pack(side=LEFT, fill=X, expand=True)
-
-        # RPM
-        f3 = tb.Frame(body)
-        f3.grid(row=2, column=1, sticky='ew', pady=5, padx=5)
-        self.controls['rpm'] = tb.Entry(f3, validate="key", validatecommand=self.vcmd_float)
-        self.controls['rpm'].pack(side=LEFT, fill=X, expand=True)
-
-        # Duration
-        f4 = tb.Frame(body)
-        f4.grid(row=3, column=1, sticky='ew', pady=5, padx=5)
-        self.controls['duration'] = tb.Entry(f4, validate="key", validatecommand=self.vcmd_float)
-        self.controls['duration'].pack(side=LEFT, fill=X, expand=True)
-
-        # Unit
-        f5 = tb.Frame(body)
-        f5.grid(row=4, column=1, sticky='ew', pady=5, padx=5)
-        self.controls['unit'] = tb.Combobox(f5, values=["s", "min", "hr"], state="readonly", width=10)
-        self.controls['unit'].pack(side=LEFT, fill=X, expand=True)
+        self.controls['direction'] = tb.Combobox(body, values=_DIRECTIONS, state="readonly", width=10)
+        self.controls['speed_mode'] = tb.Combobox(body, values=_SPEED_MODES, state="readonly", width=10)
+        self.controls['rpm'] = tb.Entry(body, validate="key", validatecommand=self.vcmd_float)
+        self.controls['duration'] = tb.Entry(body, validate="key", validatecommand=self.vcmd_float)
+        self.controls['unit'] = tb.Combobox(body, values=_TIME_UNITS, state="readonly", width=10)
+        for row, (key, _) in enumerate(_BATCH_EDIT_ROWS):
+            self.controls[key].grid(row=row, column=1, sticky='ew', pady=5, padx=5)
 
         # Checkbuttons and Labels
-        for i, (key, text) in enumerate(
-                [('direction', 'Direction:'), ('speed_mode', 'Speed Mode:'), ('rpm', 'Target RPM:'),
-                 ('duration', 'Duration:'), ('unit', 'Unit:')]):
-            cb = tb.Checkbutton(body, variable=self.vars[key], command=lambda k=key: self.toggle_control(k))
+        for i, (key, text) in enumerate(_BATCH_EDIT_ROWS):
+            cb = tb.Checkbutton(body, variable=self.vars[key], command=functools.partial(self.toggle_control, key))
             cb.grid(row=i, column=0, sticky='w', pady=5)
             tb.Label(body, text=text).grid(row=i, column=0, sticky='w', pady=5, padx=(25, 0))
             self.toggle_control(key)  # Initial state
@@ -442,22 +930,23 @@ class BatchEditDialog(BaseDialog):
                     value = widget.get()
                     if not value:
                         raise ValueError(f"'{key}' cannot be empty.")
-                    if key in ['rpm', 'duration']:
-                        value = float(value)
-                        if key == 'rpm' and not (0 <= value <= 48): raise ValueError("RPM must be between 0-48.")
-                        if key == 'duration' and value < 0: raise ValueError("Duration must be non-negative.")
-                    self.result[key] = value
+                    convert = _BATCH_VALIDATORS.get(key)
+                    self.result[key] = convert(value) if convert else value
             self.destroy()
         except Exception as e:
-            messagebox.showerror("Input Error", f"Please check your input.\n\nDetails: {e}", parent=self)
+            ErrorPopup.show_error(self, "Input Error", f"Please check your input.\n\nDetails: {e}")
 
 
 class SettingsDialog(BaseDialog):
     """ Dialog for application settings. """
+    _theme_names = None  # Filled on first open; the installed theme set does not change at runtime
 
     def __init__(self, parent, settings):
         super().__init__(parent, "Settings")
-        self.settings = copy.deepcopy(settings)  # Work on a copy
+        # Work on a copy; only templates and fonts are mutated in place, so only they need their own dicts
+        self.settings = dict(settings)
+        self.settings["templates"] = dict(settings.get("templates", {}))
+        self.settings["fonts"] = dict(settings.get("fonts", {"default": 10, "title": 12, "plot_title": 12, "editor": 11}))
 
         notebook = tb.Notebook(self, padding=10)
         notebook.pack(fill=BOTH, expand=True)
@@ -479,7 +968,9 @@ class SettingsDialog(BaseDialog):
         from ttkbootstrap.themes import standard
         theme_labels = []
         self._theme_map = {}
-        for name in parent.style.theme_names():
+        if SettingsDialog._theme_names is None:
+            SettingsDialog._theme_names = tuple(parent.style.theme_names())
+        for name in SettingsDialog._theme_names:
             t_type = standard.STANDARD_THEMES.get(name, {}).get("type", "light")
             label = f"{name.capitalize()} ({t_type.capitalize()})"
             theme_labels.append(label)
@@ -493,34 +984,33 @@ class SettingsDialog(BaseDialog):
 
         tb.Label(f_general, text="Auto-save Interval (min):").grid(row=1, column=0, sticky='w', pady=5)
         self.autosave_entry = tb.Entry(f_general, validate="key", validatecommand=self.vcmd_int)
-        self.autosave_entry.insert(0, str(self.settings.get("autosave_interval_min", 5)))
+        self.autosave_entry.insert(0, _initial_text(self.settings, "autosave_interval_min", _SETTINGS_DEFAULTS))
         self.autosave_entry.grid(row=1, column=1, sticky='ew', pady=5, padx=5)
 
         # --- Pump Tab ---
         f_pump.columnconfigure(1, weight=1)
         tb.Label(f_pump, text="Tube Inner Diameter (mm):").grid(row=0, column=0, sticky='w', pady=5)
         self.tube_id_entry = tb.Entry(f_pump, validate="key", validatecommand=self.vcmd_float)
-        self.tube_id_entry.insert(0, str(self.settings.get("tube_inner_diameter_mm", 1.0)))
+        self.tube_id_entry.insert(0, _initial_text(self.settings, "tube_inner_diameter_mm", _SETTINGS_DEFAULTS))
         self.tube_id_entry.grid(row=0, column=1, sticky='ew', pady=5, padx=5)
 
         tb.Label(f_pump, text="Volume per Revolution (µL):").grid(row=1, column=0, sticky='w', pady=5)
         self.vol_per_rev_entry = tb.Entry(f_pump, validate="key", validatecommand=self.vcmd_float)
-        self.vol_per_rev_entry.insert(0, str(self.settings.get("vol_per_rev_ul", 25.0)))
+        self.vol_per_rev_entry.insert(0, _initial_text(self.settings, "vol_per_rev_ul", _SETTINGS_DEFAULTS))
         self.vol_per_rev_entry.grid(row=1, column=1, sticky='ew', pady=5, padx=5)
 
         tb.Label(f_pump, text="Dynamic Viscosity η:").grid(row=2, column=0, sticky='w', pady=5)
         self.viscosity_entry = tb.Entry(f_pump, validate="key", validatecommand=self.vcmd_float)
-        self.viscosity_entry.insert(0, str(self.settings.get("dynamic_viscosity", DEFAULT_VISCOSITY)))
+        self.viscosity_entry.insert(0, _initial_text(self.settings, "dynamic_viscosity", _SETTINGS_DEFAULTS))
         self.viscosity_entry.grid(row=2, column=1, sticky='ew', pady=5, padx=5)
 
         tb.Label(f_pump, text="Tube Coefficient k:").grid(row=3, column=0, sticky='w', pady=5)
         self.tube_coeff_entry = tb.Entry(f_pump, validate="key", validatecommand=self.vcmd_float)
-        self.tube_coeff_entry.insert(0, str(self.settings.get("tube_coefficient", DEFAULT_TUBE_COEFFICIENT)))
+        self.tube_coeff_entry.insert(0, _initial_text(self.settings, "tube_coefficient", _SETTINGS_DEFAULTS))
         self.tube_coeff_entry.grid(row=3, column=1, sticky='ew', pady=5, padx=5)
 
         tb.Label(f_pump, text="Chamber Type:").grid(row=4, column=0, sticky='w', pady=5)
-        chamber_names = list(CHAMBER_COEFFICIENTS.keys())
-        self.chamber_cb = tb.Combobox(f_pump, values=chamber_names, state="readonly")
+        self.chamber_cb = tb.Combobox(f_pump, values=_CHAMBER_NAMES, state="readonly")
         self.chamber_cb.set(self.settings.get("chamber_type", DEFAULT_CHAMBER))
         self.chamber_cb.grid(row=4, column=1, sticky='ew', pady=5, padx=5)
         self.chamber_cb.bind("<<ComboboxSelected>>", self._update_chamber_p)
@@ -558,9 +1048,10 @@ class SettingsDialog(BaseDialog):
         vsb.pack(side=RIGHT, fill=Y)
         self.template_list.config(yscrollcommand=vsb.set)
 
-        self.templates = self.settings.get("templates", {})
-        for name in sorted(self.templates.keys()):
-            self.template_list.insert(END, name)
+        self.templates = self.settings["templates"]
+        # The list is filled the first time the tab is shown
+        self._templates_tab, self._templates_populated = f_templates, False
+        notebook.bind("<<NotebookTabChanged>>", self._maybe_populate_templates)
 
         btn_frame_templates = tb.Frame(f_templates)
         btn_frame_templates.pack(fill=X, pady=5)
@@ -578,6 +1069,13 @@ class SettingsDialog(BaseDialog):
                                                                                                 sticky=EW, padx=(5, 0))
         self.wait_window(self)
 
+    def _maybe_populate_templates(self, event):
+        if self._templates_populated or str(event.widget.select()) != str(self._templates_tab):
+            return
+        if self.templates:
+            self.template_list.insert(END, *sorted(self.templates.keys()))
+        self._templates_populated = True
+
     def delete_template(self):
         selected_indices = self.template_list.curselection()
         if not selected_indices:
@@ -612,7 +1110,7 @@ class SettingsDialog(BaseDialog):
             self.result = self.settings
             self.destroy()
         except Exception as e:
-            messagebox.showerror("Input Error", f"Please check all settings values.\n\nDetails: {e}", parent=self)
+            ErrorPopup.show_error(self, "Input Error", f"Please check all settings values.\n\nDetails: {e}")
 
 
 class AboutDialog(BaseDialog):
@@ -625,10 +1123,8 @@ class AboutDialog(BaseDialog):
         body.pack(fill=BOTH, expand=True)
 
         try:
-            icon_path = resource_path(os.path.join('icons', 'minipuls3_icon.ico'))
-            img = Image.open(icon_path)
-            img = img.resize((64, 64), Image.LANCZOS)
-            self.app_icon = ImageTk.PhotoImage(img)
+            self.app_icon = get_icon('minipuls3_icon.ico', size=(64, 64))
+            if self.app_icon is None: raise ImportError("Pillow is not installed")
             tb.Label(body, image=self.app_icon).pack(pady=(0, 10))
         except Exception as e:
             print(f"Warning: Could not load icon for About dialog: {e}")
@@ -658,19 +1154,52 @@ class PumpControlUI(tb.Window):
         self.withdraw()
 
         # --- Initialize Backend ---
-        self.command_queue, self.result_queue = queue.Queue(), queue.Queue()
-        self.pump_controller = MinipulsController(self.command_queue, self.result_queue)
+        # Results only flow to the Tk thread, which never blocks on them, so a deque (atomic append/popleft) is enough
+        self.command_queue, self.result_queue = queue.PriorityQueue(), collections.deque()
+        self._command_seq = itertools.count()  # Keeps FIFO order among commands of equal priority
+        self.pump_controller = MinipulsController(self.command_queue, self.result_queue, ui=self)
         self.controller_thread = threading.Thread(target=self.pump_controller.run, daemon=True)
         self.controller_thread.start()
 
         # --- State Variables ---
         self.sequence_thread, self.stop_event, self.pause_event = None, threading.Event(), threading.Event()
+        self.resume_event = threading.Event()  # Complement of pause_event, so the worker can block until resumed
+        self.resume_event.set()
         self.sequence_data, self.current_filepath, self.is_dirty, self.clipboard = [], None, False, None
+        self._context_menu = None  # Sequence right-click menu, built on first use
+        self._tree_rows = None  # Cached sequence_tree.get_children(); see _tree_children
+        self._ui_state_key = self._select_state = None  # Last inputs applied by _update_ui_states / _on_tree_select
+        self._manual_widgets = None  # Leaf widgets of the manual control panel, collected on first use
         self.is_connected, self.is_running_sequence, self.is_paused = False, False, False
-        self.plot_is_live, self.actual_plot_line, self.actual_plot_data, self.last_plot_direction = False, None, {
-            "time": [], "rpm": []}, None
+        self.plot_is_live, self.actual_plot_line, self.actual_plot_data, self.last_plot_direction = False, None, \
+            _SampleBuffer(), None
         self.autosave_timer_id = None
+        self._last_autosave_digest = None  # blake2b of the last backup written, to skip identical rewrites
+        self._autosave_thread = None
+        self._settings_written = None  # Bytes of the last settings file written, so unchanged saves are skipped
+        self._port_cache = (0.0, None)  # (monotonic scan time, device list)
+        self._style_job, self._style_key = None, None
+        self._font_specs = {}  # Font attribute -> spec last applied by _initialize_fonts
+        self._step_counts, self._total_duration_s = None, 0.0  # Times each step runs; None until recomputed
+        self._seq_version = 0  # Bumped on every sequence edit; keys _flat_cache
+        self._flat_cache = {}  # (version, include_disabled, only_disabled) -> flattened step list
+        self._enabled_state = (-1, False)  # (_seq_version, any step enabled)
+        self._port_scan_auto = None  # auto_select flag of the running port scan; None when idle
         self.current_rpm = 0.0
+        self._actual_plot_downsampled = None
+        self._plan_corners = None  # Data extent of the plotted plan, kept through the live axes' relim()
+        # (time, rpm, direction) samples from the sequence worker; append/popleft are atomic, so no lock is needed
+        self.plot_samples = collections.deque(maxlen=50000)
+        self._plot_drain_job = None
+        self._plot_job = None  # Pending debounced _update_plot after sequence edits
+        self._plot_stale = False  # An edit's redraw was skipped because the window was not viewable
+        self._ui_pending, self._ui_flush_scheduled = {}, False  # Sequence worker updates batched by _queue_ui
+        self._status_pending, self._status_job = {}, None  # Status bar label -> text awaiting _flush_status_bar
+        self._log_buffer = collections.deque(maxlen=LOG_MAX_LINES)  # (level, entry) pairs; the view is rebuilt from this
+        self._log_stamp = (-1, "")  # (epoch second, 'HH:MM:SS'), so bursts format the timestamp once per second
+        self._log_view_lines = 0  # Lines currently in log_text, so appends can trim the oldest ones
+        self._log_view_filter = ("ALL", None)  # (level filter, compiled search) the log view currently shows
+        self._log_filter_job = None
 
         self.geometry(self.settings.get("geometry", "1350x850"))
 
@@ -683,16 +1212,22 @@ class PumpControlUI(tb.Window):
             print(f"Warning: Could not set icon: {e}")
 
         # MODIFIED: Correct initialization order
+        self._refresh_font_cfg()
+        self._refresh_shear_factor()
+        self._refresh_color_cache()
         self._initialize_fonts()
         self._load_icons()
         self._create_widgets()
         self._configure_styles()
         self._set_direction_tag_colors()
+        self._set_log_tag_colors()
         self._create_menu()
         self._setup_shortcuts()
 
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
         self._update_com_ports(auto_select=True)
+        self.bind('<<PumpResult>>', lambda e: self._drain_results())
+        self.bind('<Map>', self._on_window_map)  # Catch up on a plot redraw skipped while minimised
         self._process_results()
 
         self.after(100, self._update_ui_states)  # Final UI state update
@@ -703,8 +1238,7 @@ class PumpControlUI(tb.Window):
     # --- Settings, Resources & Recovery ---
     def _load_settings(self):
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
+            return load_config(CONFIG_FILE)
         except (FileNotFoundError, json.JSONDecodeError):
             return {
                 "recent_files": [],
@@ -719,13 +1253,11 @@ class PumpControlUI(tb.Window):
     def _save_settings(self):
         self.settings['theme'] = self.style.theme.name
         self.settings['geometry'] = self.geometry()
-        try:
-            self.settings['main_pane'] = self.main_pane.sashpos(0)
-            self.settings['right_pane'] = self.right_pane.sashpos(0)
-        except (tk.TclError, AttributeError):
-            pass
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(self.settings, f, indent=4)
+        self.settings.update(self._sash_positions)  # Kept current by _remember_sash; no Tcl round-trips here
+        data = encode_json(self.settings)  # Compact: the file is only ever read back by load_config
+        if data == self._settings_written: return
+        write_atomic(CONFIG_FILE, data)
+        self._settings_written = data
 
     def _add_to_recent_files(self, filepath):
         if 'recent_files' not in self.settings:
@@ -740,12 +1272,10 @@ class PumpControlUI(tb.Window):
         if os.path.exists(BACKUP_FILE):
             if messagebox.askyesno("Recovery", "An unsaved session was found. Do you want to recover it?"):
                 try:
-                    with open(BACKUP_FILE, 'r') as f:
-                        recovered_data = json.load(f)
-                        self.sequence_data = recovered_data
-                        self._mark_dirty(True)
-                        self._update_treeview()
-                        self._log("Session recovered from backup.", "INFO")
+                    self.sequence_data = load_sequence_file(BACKUP_FILE)
+                    self._mark_dirty(True)
+                    self._update_treeview()
+                    self._log("Session recovered from backup.", "INFO")
                 except Exception as e:
                     messagebox.showerror("Recovery Failed", f"Could not load backup file: {e}")
             # Clean up backup file regardless of choice
@@ -762,63 +1292,46 @@ class PumpControlUI(tb.Window):
             self.autosave_timer_id = self.after(interval_ms, self._perform_autosave)
 
     def _perform_autosave(self):
-        if self.is_dirty:
+        busy = self._autosave_thread is not None and self._autosave_thread.is_alive()
+        if self.is_dirty and not busy:
             try:
-                with open(BACKUP_FILE, 'w') as f:
-                    json.dump(self.sequence_data, f)
-                self._log(f"Work auto-saved to backup file.", "INFO")
-            except Exception as e:
+                payload = encode_json(self.sequence_data)  # Snapshot on the Tk thread; only the disk I/O moves off it
+            except (TypeError, ValueError) as e:
                 self._log(f"Auto-save failed: {e}", "ERROR")
+            else:
+                digest = hashlib.blake2b(payload, digest_size=16).digest()
+                if digest != self._last_autosave_digest:
+                    self._last_autosave_digest = digest
+                    self._autosave_thread = threading.Thread(target=self._write_backup, args=(payload,), daemon=True)
+                    self._autosave_thread.start()
         self._schedule_autosave()  # Schedule next one
 
-    def _load_icons(self):
-        self.icons = {k: None for k in
-                      ['add', 'cycle', 'remove', 'clear', 'up', 'down', 'save', 'load', 'exit', 'light', 'dark',
-                       'refresh', 'edit', 'copy', 'paste', 'duplicate', 'play', 'stop', 'new_file', 'help', 'about',
-                       'pause', 'settings', 'template_add', 'template_load', 'export_img', 'export_csv', 'batch_edit',
-                       'toggle_on', 'toggle_off']}
-        self.icon_images = {}
-        if not ImageTk:
-            return
-
-        icon_map = {
-            'new_file': 'file-earmark-plus.png', 'load': 'folder2-open.png', 'save': 'save.png',
-            'exit': 'box-arrow-right.png',
-            'light': 'sun.png', 'dark': 'moon-stars.png', 'help': 'question-circle.png', 'about': 'info-circle.png',
-            'add': 'plus-circle-dotted.png', 'cycle': 'arrow-repeat.png', 'edit': 'pencil-square.png',
-            'remove': 'trash.png', 'clear': 'x-octagon.png', 'up': 'arrow-up-circle.png',
-            'down': 'arrow-down-circle.png', 'copy': 'clipboard.png', 'paste': 'clipboard-plus.png',
-            'duplicate': 'files.png', 'play': 'play-circle.png', 'stop': 'stop-circle.png',
-            'refresh': 'arrow-clockwise.png', 'pause': 'pause-circle.png', 'settings': 'gear.png',
-            'template_add': 'bookmark-plus.png', 'template_load': 'bookmark-check.png',
-            'export_img': 'image.png', 'export_csv': 'file-earmark-ruled.png',
-            'batch_edit': 'pencil-fill.png', 'toggle_on': 'toggle-on.png', 'toggle_off': 'toggle-off.png'
-        }
-
-        for name, filename in icon_map.items():
-            try:
-                path = resource_path(os.path.join('icons', filename))
-                img = Image.open(path).convert("RGBA").resize(ICON_SIZE, Image.LANCZOS)
-                self.icon_images[name] = img
-            except Exception as e:
-                print(f"Warning: Could not load icon '{filename}': {e}")
+    def _write_backup(self, payload):
+        """ Autosave worker: writes the backup off the Tk thread and reports back through the result queue. """
+        try:
+            write_atomic(BACKUP_FILE, payload)
+            self.pump_controller.post_result({"status": "autosaved", "msg": "Work auto-saved to backup file."})
+        except OSError as e:
+            self._last_autosave_digest = None  # Retry on the next tick
+            self.pump_controller.post_result({"status": "autosave_failed", "msg": f"Auto-save failed: {e}"})
 
+    def _load_icons(self):
+        # PhotoImages are decoded on first lookup (see _LazyIconDict); only the tint is decided here
+        _load_pil()
+        self.icons = _LazyIconDict()
         self._apply_icon_colors()
 
     def _apply_icon_colors(self):
         """Tint icons white for dark themes and black for light themes."""
-        if not ImageTk or not hasattr(self, 'icon_images'):
+        if not ImageTk:
             return
 
         from ttkbootstrap.themes import standard
         t_type = standard.STANDARD_THEMES.get(self.style.theme.name, {}).get('type', 'light')
         target = (255, 255, 255) if t_type == 'dark' else (0, 0, 0)
-
-        for name, img in self.icon_images.items():
-            alpha = img.split()[-1]
-            colored = Image.new('RGBA', img.size, target + (255,))
-            colored.putalpha(alpha)
-            self.icons[name] = ImageTk.PhotoImage(colored)
+        if target != self.icons.tint:
+            self.icons.tint = target
+            self.icons.clear()  # Re-fetched lazily in the new colour (get_icon keeps both variants cached)
 
         self._refresh_icon_widgets()
 
@@ -840,55 +1353,100 @@ class PumpControlUI(tb.Window):
             self.pause_seq_btn.config(image=self.icons['pause'])
             self.stop_seq_btn.config(image=self.icons['stop'])
         if hasattr(self, 'status_label') and hasattr(self, 'status_icon_key'):
-            self.status_label.config(image=self.icons.get(self.status_icon_key, self.icons['stop']))
+            self.status_label.config(image=self.icons[self.status_icon_key])
+
+    def _refresh_font_cfg(self):
+        """Caches the font sizes from settings; call again whenever settings are replaced."""
+        fonts = self.settings.get("fonts", {"default": 10, "title": 12, "plot_title": 12, "editor": 11})
+        title = fonts.get("title", 12)
+        self._font_cfg = SimpleNamespace(default=fonts.get("default", 10), title=title,
+                                         plot_title=fonts.get("plot_title", title), editor=fonts.get("editor", 11))
+
+    def _refresh_shear_factor(self, _C=CHAMBER_COEFFICIENTS):
+        """Caches viscosity x chamber constant x tube coefficient; None if a setting is not a number."""
+        try:
+            eta = float(self.settings.get("dynamic_viscosity", DEFAULT_VISCOSITY))
+            p_const = float(self.settings.get(
+                "chamber_p_value",
+                _C.get(self.settings.get("chamber_type", DEFAULT_CHAMBER), 176.1),
+            ))
+            k_coeff = float(self.settings.get("tube_coefficient", DEFAULT_TUBE_COEFFICIENT))
+            self._shear_factor = eta * p_const * k_coeff
+        except (TypeError, ValueError):
+            self._shear_factor = None
 
     def _initialize_fonts(self):
         """Initializes font objects based on settings."""
-        fonts = self.settings.get("fonts", {"default": 10, "title": 12, "plot_title": 12, "editor": 11})
-        base_size = fonts.get("default", 10)
-        title_size = fonts.get("title", 12)
-        plot_title_size = fonts.get("plot_title", title_size)
-        editor_size = fonts.get("editor", 11)
+        cfg = self._font_cfg
+        base_size, title_size = cfg.default, cfg.title
 
+        # Reconfiguring a font makes Tk re-measure every widget that uses it, so only touch fonts that changed
+        applied = self._font_specs
         self.default_font = font.nametofont("TkDefaultFont")
-        self.default_font.configure(size=base_size)
-        self.title_font = font.Font(family="Segoe UI", size=title_size, weight="bold")
-        self.status_font = font.Font(family="Segoe UI", size=base_size, weight="bold")
-        self.small_font = font.Font(family="Segoe UI", size=base_size - 1)
-        self.mono_font = font.Font(family="Consolas", size=base_size)
-        self.editor_font = font.Font(family="Segoe UI", size=editor_size)
-        self.plot_title_font = font.Font(family="Segoe UI", size=plot_title_size, weight="bold")
-        self.menu_font = font.Font(family="Segoe UI", size=title_size + 2, weight="bold")
+        if applied.get('default_font') != base_size:
+            self.default_font.configure(size=base_size)
+            applied['default_font'] = base_size
+        specs = {
+            'title_font': dict(family="Segoe UI", size=title_size, weight="bold"),
+            'status_font': dict(family="Segoe UI", size=base_size, weight="bold"),
+            'small_font': dict(family="Segoe UI", size=base_size - 1),
+            'mono_font': dict(family="Consolas", size=base_size),
+            'editor_font': dict(family="Segoe UI", size=cfg.editor),
+            'plot_title_font': dict(family="Segoe UI", size=cfg.plot_title, weight="bold"),
+            'menu_font': dict(family="Segoe UI", size=title_size + 2, weight="bold"),
+        }
+        for attr, spec in specs.items():
+            if applied.get(attr) == spec: continue
+            applied[attr] = spec
+            existing = getattr(self, attr, None)
+            if existing is None:
+                setattr(self, attr, font.Font(**spec))
+            else:
+                existing.configure(**spec)  # Widgets using this named font pick up the change
 
     def _configure_styles(self):
-        """Configures the ttkbootstrap style system with custom fonts."""
-        fonts = self.settings.get("fonts", {"default": 10, "title": 12, "plot_title": 12, "editor": 11})
-        editor_size = fonts.get("editor", 11)
+        """Configures the ttkbootstrap style system with custom fonts (coalesced into one pass per idle)."""
+        if self._style_job is None:
+            self._style_job = self.after_idle(self._apply_styles)
+
+    def _apply_styles(self):
+        self._style_job = None
+        editor_size = self._font_cfg.editor
+        # Fonts are named Tk fonts reconfigured in place, so only these inputs change what the styles resolve to
+        palette = self._palette
+        key = (self.style.theme.name, editor_size, palette['light'], palette['primary'])
+        if key == self._style_key: return  # Re-styling every Treeview would re-layout them for nothing
+        self._style_key = key
 
         # Ensure label frame titles honor the Panel Title Size setting
         self.style.configure('TLabelframe.Label', font=self.title_font)
         self.style.configure('Treeview', rowheight=int(editor_size * 2.5), font=self.editor_font,
-                             bordercolor=self.style.colors.light, borderwidth=1, relief='solid')
+                             bordercolor=palette['light'], borderwidth=1, relief='solid')
         # Style with light grid lines for the sequence editor
         self.style.configure('Table.Treeview', rowheight=int(editor_size * 2.5), font=self.editor_font,
-                             bordercolor=self.style.colors.light, borderwidth=1, relief='solid',
-                             rowbordercolor=self.style.colors.light, rowborderwidth=1)
+                             bordercolor=palette['light'], borderwidth=1, relief='solid',
+                             rowbordercolor=palette['light'], rowborderwidth=1)
         self.style.configure('Treeview.Heading', font=self.title_font)
-        self.style.map('Treeview', background=[('selected', self.style.colors.primary)])
+        self.style.map('Treeview', background=[('selected', palette['primary'])])
         self.style.configure("Disabled.Treeview", foreground='gray')
 
+    def _refresh_color_cache(self):
+        """Snapshot the theme colours as plain strings; refreshed whenever the theme may have changed."""
+        colors = self.style.colors
+        self._palette = {name: colors.get(name) for name in
+                         ('primary', 'secondary', 'info', 'danger', 'light', 'fg', 'bg')}
+
     def _set_direction_tag_colors(self):
         if hasattr(self, 'sequence_tree'):
             from ttkbootstrap import colorutils
-            colors = self.style.colors
             fwd = colorutils.update_hsl_value(
-                colors.info,
+                self._palette['info'],
                 lum=90,
                 inmodel=colorutils.HEX,
                 outmodel=colorutils.HEX,
             )
             rev = colorutils.update_hsl_value(
-                colors.danger,
+                self._palette['danger'],
                 lum=90,
                 inmodel=colorutils.HEX,
                 outmodel=colorutils.HEX,
@@ -897,14 +1455,24 @@ class PumpControlUI(tb.Window):
             self.sequence_tree.tag_configure('backward', background=rev)
             self.sequence_tree.tag_configure('disabled', foreground='red')
 
+    def _set_log_tag_colors(self):
+        if hasattr(self, 'log_text'):
+            self.log_text.tag_config("error", foreground=self._palette['danger'])
+            self.log_text.tag_config("connection", foreground=self._palette['info'])
+
     def _update_styles_and_widgets(self):
         """Re-initializes fonts, re-configures styles, and updates widgets."""
+        self._refresh_color_cache()
         self._initialize_fonts()
         self._configure_styles()
         self._apply_icon_colors()
         self._set_direction_tag_colors()
+        self._set_log_tag_colors()
         if hasattr(self, '_menu_bar'):
             self._create_menu()
+        if self._context_menu is not None:  # Rebuilt on next use with the re-tinted icons
+            self._context_menu.destroy()
+            self._context_menu = None
         # Update widgets that depend on these styles
         if hasattr(self, 'sequence_tree'):
             self._update_treeview()
@@ -918,15 +1486,16 @@ class PumpControlUI(tb.Window):
         # Update log text font if necessary
         self.log_text.config(font=self.small_font)
 
-    def _update_plot_style(self):
+    def _update_plot_style(self, redraw=True):
+        """ Apply theme colours and fonts to both plots; redraw=False leaves rendering to the caller. """
         if not hasattr(self, 'ax_overview'): return
         try:
-            colors = self.style.colors
-            bg, fg, grid_c = colors.get('bg'), colors.get('fg'), colors.get('light')
+            palette = self._palette
+            bg, fg, grid_c = palette['bg'], palette['fg'], palette['light']
 
-            default_fp = FontProperties(family=self.default_font.cget("family"), size=self.default_font.cget("size"))
-            title_fp = FontProperties(family=self.plot_title_font.cget("family"), size=self.plot_title_font.cget("size"),
-                                      weight=self.plot_title_font.cget("weight"))
+            default_fp = _font_properties(self.default_font.cget("family"), self.default_font.cget("size"))
+            title_fp = _font_properties(self.plot_title_font.cget("family"), self.plot_title_font.cget("size"),
+                                        self.plot_title_font.cget("weight"))
 
             for fig, ax, canvas in (
                 (self.fig_overview, self.ax_overview, self.canvas_overview),
@@ -945,12 +1514,18 @@ class PumpControlUI(tb.Window):
                 ax.title.set_color(fg)
                 ax.title.set_fontproperties(title_fp)
                 ax.grid(True, linestyle='--', color=grid_c, alpha=0.6)
-                canvas.draw()
+                if redraw: canvas.draw()
         except Exception as e:
             print(f"Warning: Failed to update plot style: {e}")
 
     # --- UI Creation ---
     def _create_widgets(self):
+        # Key validators are shared with the dialogs: one pair of Tcl commands for the whole interpreter
+        float_cmd, int_cmd = _get_validators(self)
+        self.vcmd_float, self.vcmd_int = (float_cmd, '%P'), (int_cmd, '%P')
+        # Sash positions as last placed by the user, saved with the settings
+        self._sash_positions = {"main_pane": self.settings.get("main_pane", 400),
+                                "right_pane": self.settings.get("right_pane", 450)}
         self.main_pane = tb.PanedWindow(self, orient=HORIZONTAL)
         self.main_pane.pack(fill=BOTH, expand=True, padx=10, pady=(5, 0))
 
@@ -960,14 +1535,16 @@ class PumpControlUI(tb.Window):
         left_panel = ScrolledFrame(left_wrapper, autohide=True)
         left_panel.pack(fill=BOTH, expand=TRUE)
 
-        self._create_connection_panel(left_panel.container)
-        self._create_execution_panel(left_panel.container)
-        self._create_manual_control_panel(left_panel.container)
+        with _batched_updates(self, left_panel.container):
+            self._create_connection_panel(left_panel.container)
+            self._create_execution_panel(left_panel.container)
+            self._create_manual_control_panel(left_panel.container)
 
-        # Log panel should remain visible at the bottom of the left side
-        self._create_log_panel(left_wrapper)
+            # Log panel should remain visible at the bottom of the left side
+            self._create_log_panel(left_wrapper)
 
-        self.main_pane.after(100, lambda: self.main_pane.sashpos(0, self.settings.get("main_pane", 400)))
+        self.main_pane.after(100, lambda: self.main_pane.sashpos(0, self._sash_positions["main_pane"]))
+        self.main_pane.bind("<ButtonRelease-1>", lambda e: self._remember_sash("main_pane", self.main_pane))
 
         self.right_pane = tb.PanedWindow(self.main_pane, orient=VERTICAL)
         self.main_pane.add(self.right_pane, weight=4)
@@ -979,14 +1556,17 @@ class PumpControlUI(tb.Window):
         self.right_pane.add(bottom_right_frame, weight=2)
 
         self._create_sequence_editor(top_right_frame)
-        if FigureCanvasTkAgg:
-            self._create_plot_panel(bottom_right_frame)
-        else:
-            tb.Label(bottom_right_frame, text="Matplotlib not available", padding=10).pack(fill=BOTH, expand=True)
+        # Matplotlib is imported only after the window is up, so it does not delay startup
+        self.after(100, self._create_deferred_plot_panel, bottom_right_frame)
 
-        self.right_pane.after(100, lambda: self.right_pane.sashpos(0, self.settings.get("right_pane", 450)))
+        self.right_pane.after(100, lambda: self.right_pane.sashpos(0, self._sash_positions["right_pane"]))
+        self.right_pane.bind("<ButtonRelease-1>", lambda e: self._remember_sash("right_pane", self.right_pane))
         self._create_status_bar()
 
+    def _remember_sash(self, name, pane):
+        """ Record a sash position when the user lets go of it and once more on close, rather than on every save. """
+        self._sash_positions[name] = pane.sashpos(0)
+
     def _create_menu(self):
         menu_bar = tb.Menu(self)
         menu_bar.configure(font=self.menu_font)
@@ -1091,8 +1671,7 @@ class PumpControlUI(tb.Window):
         ToolTip(self.refresh_btn, text="Refresh COM port list.", bootstyle="info")
 
         tb.Label(conn_grid, text="Unit ID:").grid(row=1, column=0, sticky=W, pady=2)
-        self.unit_id_entry = tb.Entry(conn_grid, width=15, validate="key",
-                                      validatecommand=(self.register(self.validate_int), '%P'))
+        self.unit_id_entry = tb.Entry(conn_grid, width=15, validate="key", validatecommand=self.vcmd_int)
         self.unit_id_entry.insert(0, self.settings.get("unit_id", "30"))
         self.unit_id_entry.grid(row=1, column=1, columnspan=2, sticky=EW, padx=5, pady=2)
 
@@ -1153,9 +1732,8 @@ class PumpControlUI(tb.Window):
         speed_label_frame = tb.Frame(container)
         speed_label_frame.grid(row=1, column=0, columnspan=2, sticky=EW, pady=(0, 10))
         tb.Label(speed_label_frame, text="RPM:").pack(side=LEFT)
-        self.vcmd_float_main = (self.register(self.validate_float), '%P')
         self.manual_rpm_entry = tb.Entry(speed_label_frame, width=6, validate="key",
-                                         validatecommand=self.vcmd_float_main)
+                                         validatecommand=self.vcmd_float)
         self.manual_rpm_entry.pack(side=LEFT, padx=5)
         self.manual_rpm_entry.bind("<Return>", self._set_rpm_from_entry)
         ToolTip(self.manual_rpm_entry, "Type RPM (0-48) and press Enter.", bootstyle="info")
@@ -1222,6 +1800,12 @@ class PumpControlUI(tb.Window):
                                 command=lambda: self._move_selected_item(-1), bootstyle="secondary-outline")
         self.up_btn.pack(side=RIGHT, padx=(10, 2))
 
+    def _create_deferred_plot_panel(self, parent):
+        if _ensure_matplotlib():
+            self._create_plot_panel(parent)
+        else:
+            tb.Label(parent, text="Matplotlib not available", padding=10).pack(fill=BOTH, expand=True)
+
     def _create_plot_panel(self, parent):
         self.plot_pane = tb.PanedWindow(parent, orient=VERTICAL)
         self.plot_pane.pack(fill=BOTH, expand=True, padx=(10, 0), pady=(10, 0))
@@ -1252,6 +1836,11 @@ class PumpControlUI(tb.Window):
         ToolTip(self.canvas_overview.get_tk_widget(), "Overview of the full sequence")
         ToolTip(self.canvas_live.get_tk_widget(), "Live tracking of the current step")
 
+        # Cached axes backgrounds used to blit the live 'Actual' line without re-rendering the figure
+        self._plot_backgrounds = {}
+        self.canvas_overview.mpl_connect('draw_event', self._on_plot_draw)
+        self.canvas_live.mpl_connect('draw_event', self._on_plot_draw)
+
         plot_btn_frame = tb.Frame(plot_frame)
         plot_btn_frame.pack(fill=X, pady=(5, 0))
 
@@ -1263,6 +1852,7 @@ class PumpControlUI(tb.Window):
         ToolTip(plot_btn_frame.winfo_children()[-1], "Export sequence data as CSV")
 
         self.live_track_var = tk.BooleanVar(value=False)
+        self._stale_canvases = None  # Canvases whose figure changed while their tab was hidden; None until first plot
         self.plot_tabs.bind("<<NotebookTabChanged>>", self._on_plot_tab_change)
         self._on_plot_tab_change()  # Initialize state
 
@@ -1306,31 +1896,45 @@ class PumpControlUI(tb.Window):
         if not sel: return
         idx = self.sequence_tree.index(sel[0])
 
+        cm = self._context_menu
+        if cm is None:
+            cm = self._context_menu = self._build_context_menu()
+        cm.entryconfigure(self._CM_PASTE, state=NORMAL if self.clipboard else DISABLED)
+
+        is_enabled = self.sequence_data[idx].get("enabled", True)
+        toggle_text = "Disable" if is_enabled else "Enable"
+        toggle_icon = self.icons['toggle_off'] if is_enabled else self.icons['toggle_on']
+        cm.entryconfigure(self._CM_TOGGLE, label=f" {toggle_text} Step", image=toggle_icon)
+
+        cm.entryconfigure(self._CM_UP, state=NORMAL if idx > 0 else DISABLED)
+        cm.entryconfigure(self._CM_DOWN, state=NORMAL if idx < len(self.sequence_data) - 1 else DISABLED)
+        cm.tk_popup(event.x_root, event.y_root)
+
+    # Entry indices in the sequence context menu that _show_context_menu updates per popup
+    _CM_PASTE, _CM_TOGGLE, _CM_UP, _CM_DOWN = 2, 4, 6, 7
+
+    def _build_context_menu(self):
+        """ Build the sequence context menu once; it is reused until the icons change colour. """
         cm = tb.Menu(self, tearoff=0)
-        cm.add_command(label=" Edit", image=self.icons['edit'], compound=LEFT, command=lambda: self._edit_item(event))
+        cm.add_command(label=" Edit", image=self.icons['edit'], compound=LEFT, command=self._edit_item)
         cm.add_command(label=" Copy", image=self.icons['copy'], compound=LEFT, command=self._copy_item,
                        accelerator="Ctrl+C")
         cm.add_command(label=" Paste Below", image=self.icons['paste'], compound=LEFT, command=self._paste_item,
-                       accelerator="Ctrl+V", state=NORMAL if self.clipboard else DISABLED)
+                       accelerator="Ctrl+V")
         cm.add_command(label=" Duplicate", image=self.icons['duplicate'], compound=LEFT, command=self._duplicate_item,
                        accelerator="Ctrl+D")
-
-        is_enabled = self.sequence_data[idx].get("enabled", True)
-        toggle_text = "Disable" if is_enabled else "Enable"
-        toggle_icon = self.icons['toggle_off'] if is_enabled else self.icons['toggle_on']
-        cm.add_command(label=f" {toggle_text} Step", image=toggle_icon, compound=LEFT,
+        cm.add_command(label=" Disable Step", image=self.icons['toggle_off'], compound=LEFT,
                        command=self._toggle_item_enabled)
 
         cm.add_separator()
         cm.add_command(label=" Move Up", image=self.icons['up'], compound=LEFT,
-                       command=lambda: self._move_selected_item(-1), state=NORMAL if idx > 0 else DISABLED)
+                       command=functools.partial(self._move_selected_item, -1))
         cm.add_command(label=" Move Down", image=self.icons['down'], compound=LEFT,
-                       command=lambda: self._move_selected_item(1),
-                       state=NORMAL if idx < len(self.sequence_data) - 1 else DISABLED)
+                       command=functools.partial(self._move_selected_item, 1))
         cm.add_separator()
         cm.add_command(label=" Remove", image=self.icons['remove'], compound=LEFT, command=self._remove_item,
                        accelerator="Delete")
-        cm.tk_popup(event.x_root, event.y_root)
+        return cm
 
     def _setup_shortcuts(self):
         self.bind_all("<Control-n>", self._clear_sequence)
@@ -1342,23 +1946,6 @@ class PumpControlUI(tb.Window):
         self.bind_all("<Control-v>", self._paste_item)
         self.bind_all("<Control-d>", self._duplicate_item)
 
-    # --- Validation Methods ---
-    def validate_float(self, val):
-        if val in ["", "-"]: return True
-        try:
-            float(val)
-            return True
-        except ValueError:
-            return False
-
-    def validate_int(self, val):
-        if val in ["", "-"]: return True
-        try:
-            int(val)
-            return True
-        except ValueError:
-            return False
-
     # --- UI Update & State Management ---
     def _set_theme(self, theme_name):
         """Applies a theme and updates all style-dependent widgets."""
@@ -1370,6 +1957,8 @@ class PumpControlUI(tb.Window):
         dialog = SettingsDialog(self, self.settings)
         if dialog.result:
             self.settings = dialog.result
+            self._refresh_font_cfg()
+            self._refresh_shear_factor()
             self.style.theme_use(self.settings.get("theme", "litera"))
             self._update_styles_and_widgets()
             self._update_templates_menu()
@@ -1379,6 +1968,13 @@ class PumpControlUI(tb.Window):
 
     def _update_ui_states(self):
         is_seq_running = self.is_running_sequence
+        has_enabled = self._has_enabled_steps()
+        # Every widget state below follows from these; reconfiguring them unchanged is pure Tcl traffic
+        key = (self.is_connected, is_seq_running, has_enabled)
+        if key == self._ui_state_key:
+            self._on_tree_select()
+            return
+        self._ui_state_key = key
 
         # Connection Panel
         conn_state = DISABLED if is_seq_running else NORMAL
@@ -1389,19 +1985,19 @@ class PumpControlUI(tb.Window):
         self.refresh_btn.config(state=conn_state)
 
         # Execution Panel
-        can_run = self.is_connected and not is_seq_running and any(s.get("enabled", True) for s in self.sequence_data)
+        can_run = self.is_connected and not is_seq_running and has_enabled
         self.run_seq_btn.config(state=NORMAL if can_run else DISABLED)
         self.pause_seq_btn.config(state=NORMAL if is_seq_running else DISABLED)
         self.stop_seq_btn.config(state=NORMAL if is_seq_running else DISABLED)
 
         # Manual Control
         manual_state = NORMAL if self.is_connected and not is_seq_running else DISABLED
-        for w in self.manual_frame.sub_frame.winfo_children():
+        if self._manual_widgets is None:  # The manual panel is static, so walk its children only once
+            self._manual_widgets = [grandchild for w in self.manual_frame.sub_frame.winfo_children()
+                                    for grandchild in (w.winfo_children() if isinstance(w, tb.Frame) else (w,))]
+        for w in self._manual_widgets:
             try:
-                if isinstance(w, (tb.Frame)):
-                    for grandchild in w.winfo_children(): grandchild.config(state=manual_state)
-                else:
-                    w.config(state=manual_state)
+                w.config(state=manual_state)
             except tk.TclError:
                 pass
 
@@ -1412,11 +2008,21 @@ class PumpControlUI(tb.Window):
         self.clear_btn.config(state=editor_state)
         self._on_tree_select()  # Update selection-based buttons
 
+    def _has_enabled_steps(self):
+        """ Whether any step is enabled; rescanned only after an edit bumps _seq_version. """
+        version, has_enabled = self._enabled_state
+        if version != self._seq_version:
+            has_enabled = any(s.get("enabled", True) for s in self.sequence_data)
+            self._enabled_state = (self._seq_version, has_enabled)
+        return has_enabled
+
     def _on_tree_select(self, event=None):
         """Updates UI based on Treeview selection."""
         is_seq_running = self.is_running_sequence
         has_selection = bool(self.sequence_tree.selection())
         editor_state = NORMAL if not is_seq_running and has_selection else DISABLED
+        if editor_state == self._select_state: return
+        self._select_state = editor_state
 
         self.remove_btn.config(state=editor_state)
         self.up_btn.config(state=editor_state)
@@ -1424,111 +2030,171 @@ class PumpControlUI(tb.Window):
 
     @contextlib.contextmanager
     def _busy_cursor(self):
+        """ Show a watch cursor around blocking work on the Tk thread (file I/O only). """
         self.config(cursor="watch")
-        self.update_idletasks()
+        self.update_idletasks()  # Flush once so the cursor shows before the blocking work starts
         try:
             yield
         finally:
             self.config(cursor="")
 
     def _update_status_bar(self, status_text=None, filename_text=None, info_text=None):
-        if status_text is not None: self.status_label.config(text=status_text)
-        if filename_text is not None: self.status_filename.config(text=filename_text)
-        if info_text is not None: self.status_info.config(text=info_text)
+        """ Queue status bar text; a burst of updates reaches the widgets once, on the next idle pass. """
+        pending = self._status_pending
+        if status_text is not None: pending[self.status_label] = status_text
+        if filename_text is not None: pending[self.status_filename] = filename_text
+        if info_text is not None: pending[self.status_info] = info_text
+        if pending and self._status_job is None:
+            self._status_job = self.after_idle(self._flush_status_bar)
+
+    def _flush_status_bar(self):
+        self._status_job = None
+        pending, self._status_pending = self._status_pending, {}
+        for label, text in pending.items():
+            label.config(text=text)
 
     # --- Backend Communication ---
-    def _send_pump_command(self, command_str):
-        self.command_queue.put({"action": "send_command", "command_str": command_str})
+    def _queue_command(self, command, urgent=False):
+        self.command_queue.put((0 if urgent else 1, next(self._command_seq), command))
+
+    def _send_pump_command(self, command_str, urgent=False):
+        self._queue_command({"action": "send_command", "command_str": command_str}, urgent)
+
+    def _send_pump_bytes(self, data):
+        self._queue_command({"action": "send_bytes", "data": data})
 
-    def _process_results(self):
+    def _process_results(self, empty_streak=0):
+        """ Safety-net poll; normally results arrive through the <<PumpResult>> virtual event. It re-polls after 5 ms
+        while it keeps finding results (a notification was lost) and backs off to 200 ms once the queue stays empty. """
+        drained = 0
         try:
-            while not self.result_queue.empty():
-                result = self.result_queue.get_nowait()
-                status, msg = result.get("status"), result.get("msg")
-
-                log_level = "INFO"
-                if status == "error":
-                    log_level = "ERROR"
-                    messagebox.showerror("Controller Error", msg)
-                elif status in ["connected", "disconnected"]:
-                    log_level = "CONNECTION"
-
-                if status != "log": self._log(msg, log_level)
-
-                if status == "connected":
-                    self.is_connected = True
-                    self.status_label.config(text=" Status: Connected", image=self.icons['play'],
-                                             bootstyle="inverse-success")
-                    self.status_icon_key = 'play'
-                    self.settings['last_com_port'] = self.com_port_cb.get()
-                    self.settings['unit_id'] = self.unit_id_entry.get()
-                    self._send_pump_command("SR")
-                elif status == "disconnected":
-                    self.is_connected = False
-                    self.is_running_sequence = False  # Force stop if disconnected
-                    self.status_label.config(text=" Status: Disconnected", image=self.icons['stop'],
-                                             bootstyle="inverse-secondary")
-                    self.status_icon_key = 'stop'
-                self._update_ui_states()
+            drained = self._drain_results()
         finally:
-            self.after(100, self._process_results)
+            empty_streak = 0 if drained else empty_streak + 1
+            self.after(5 if drained else min(200, 20 * empty_streak), self._process_results, empty_streak)
+
+    def _drain_results(self):
+        """ Apply all queued controller results; returns how many there were. """
+        # Drain everything queued so far, then touch the widgets once per batch.
+        # This is the only consumer, so len() is a safe bound; anything appended meanwhile waits for the next event.
+        batch = [self.result_queue.popleft() for _ in range(len(self.result_queue))]
+        if not batch: return 0
+
+        errors, connection_state = [], None
+        for result in batch:
+            status, msg = result.get("status"), result.get("msg")
+            if status == "ports":
+                self._port_cache = (time.monotonic(), result["ports"])
+                self._apply_com_ports(result["ports"], self._port_scan_auto)
+                self._port_scan_auto = None
+                continue
+
+            log_level = "INFO"
+            if status == "error":
+                log_level = "ERROR"
+                errors.append(msg)
+            elif status == "autosave_failed":
+                log_level = "ERROR"  # Logged only; a dialog every few minutes would be worse than the failure
+            elif status in ["connected", "disconnected"]:
+                log_level = "CONNECTION"
+                connection_state = status  # Only the latest connection change matters
+
+            if status != "log": self._log(msg, log_level)
+
+        if connection_state == "connected":
+            self.is_connected = True
+            self.status_label.config(text=" Status: Connected", image=self.icons['play'],
+                                     bootstyle="inverse-success")
+            self.status_icon_key = 'play'
+            self.settings['last_com_port'] = self.com_port_cb.get()
+            self.settings['unit_id'] = self.unit_id_entry.get()
+            self._send_pump_command("SR")
+        elif connection_state == "disconnected":
+            self.is_connected = False
+            self.is_running_sequence = False  # Force stop if disconnected
+            self.status_label.config(text=" Status: Disconnected", image=self.icons['stop'],
+                                     bootstyle="inverse-secondary")
+            self.status_icon_key = 'stop'
+        self._update_ui_states()
+        if errors:
+            messagebox.showerror("Controller Error", "\n".join(dict.fromkeys(errors)))
+        return len(batch)
 
     def _log(self, message, level="INFO"):
         """ Logs a message with a level for filtering. """
-        timestamp = time.strftime('%H:%M:%S')
+        now = int(time.time())
+        second, timestamp = self._log_stamp
+        if now != second:
+            timestamp = time.strftime('%H:%M:%S', time.localtime(now))
+            self._log_stamp = (now, timestamp)
         log_entry = f"{timestamp} [{level}] - {message}\n"
+        self._log_buffer.append((level, log_entry))
 
-        # This internal list stores all logs
-        if not hasattr(self, '_all_logs'):
-            self._all_logs = []
-        self._all_logs.append(log_entry)
-
-        self._apply_log_filter()
+        # Append just this line when it passes the current filter; the view is only rebuilt when the filter changes
+        if not hasattr(self, 'log_text') or not self.log_text.winfo_exists(): return
+        filt, search = self._log_view_filter
+        if (filt == "ALL" or filt == level) and (search is None or search.search(log_entry)):
+            self.log_text.config(state=NORMAL)
+            self.log_text.insert(END, log_entry, (_LOG_LEVEL_TAGS.get(level, "normal"),))
+            self._log_view_lines += log_entry.count("\n")
+            excess = self._log_view_lines - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+                self._log_view_lines = LOG_MAX_LINES
+            self.log_text.config(state=DISABLED)
+            self.log_text.see(END)
 
     def _apply_log_filter(self, event=None):
+        """ Debounce filter/search changes so typing re-renders the log once, 150 ms after the last keystroke. """
+        if self._log_filter_job: self.after_cancel(self._log_filter_job)
+        self._log_filter_job = self.after(150, self._refresh_log_view)
+
+    def _refresh_log_view(self):
         """ Filters and displays logs in the text widget. """
+        self._log_filter_job = None
         if not hasattr(self, 'log_text') or not self.log_text.winfo_exists(): return
-        if not hasattr(self, '_all_logs'): return
 
         filt = self.log_filter_cb.get()
-        search_term = self.log_search_entry.get().lower()
+        search_term = self.log_search_entry.get()
+        search = re.compile(re.escape(search_term), re.IGNORECASE) if search_term else None
+        if (filt, search) == self._log_view_filter: return  # e.g. a cursor key in the search box
+        self._log_view_filter = (filt, search)
+
+        # One insert call with alternating text/tags arguments instead of one call per line
+        args, lines = [], 0
+        for level, entry in self._log_buffer:
+            if (filt == "ALL" or filt == level) and (search is None or search.search(entry)):
+                args += (entry, (_LOG_LEVEL_TAGS.get(level, "normal"),))
+                lines += entry.count("\n")
+        self._log_view_lines = lines
 
         self.log_text.config(state=NORMAL)
         self.log_text.delete(1.0, END)
-
-        for entry in self._all_logs:
-            display = False
-            if (filt == "ALL" or f"[{filt}]" in entry):
-                if not search_term or search_term in entry.lower():
-                    display = True
-
-            if display:
-                level_tag = "normal"
-                if "[ERROR]" in entry:
-                    level_tag = "error"
-                elif "[CONNECTION]" in entry:
-                    level_tag = "connection"
-
-                self.log_text.tag_config("error", foreground=self.style.colors.danger)
-                self.log_text.tag_config("connection", foreground=self.style.colors.info)
-
-                self.log_text.insert(END, entry, (level_tag,))
-
+        if args: self.log_text.insert(END, *args)
         self.log_text.config(state=DISABLED)
         self.log_text.see(END)
 
     # --- Widget Logic & Callbacks ---
     def _update_com_ports(self, auto_select=False):
-        with self._busy_cursor():
-            ports = [port.device for port in serial.tools.list_ports.comports()]
-            self.com_port_cb['values'] = ports
-            last_port = self.settings.get("last_com_port")
+        # Enumeration is slow on some platforms, so the controller thread does it and posts a "ports" result
+        scanned_at, ports = self._port_cache
+        if ports is not None and time.monotonic() - scanned_at < 2.0:  # Collapse rapid repeated clicks
+            self._apply_com_ports(ports, auto_select)
+        elif self._port_scan_auto is None:
+            self._port_scan_auto = auto_select
+            self._queue_command({"action": "list_ports"})
+        else:
+            self._port_scan_auto |= auto_select  # A scan is already running; just remember the request
+
+    def _apply_com_ports(self, ports, auto_select):
+        self.com_port_cb['values'] = ports
+        last_port = self.settings.get("last_com_port")
 
-            if auto_select:
-                if last_port and last_port in ports:
-                    self.com_port_cb.set(last_port)
-                elif ports:
-                    self.com_port_cb.set(ports[0])
+        if auto_select:
+            if last_port and last_port in ports:
+                self.com_port_cb.set(last_port)
+            elif ports:
+                self.com_port_cb.set(ports[0])
 
     def _connect_pump(self):
         port = self.com_port_cb.get()
@@ -1539,16 +2205,16 @@ class PumpControlUI(tb.Window):
             messagebox.showerror("Input Error", "Unit ID must be an integer.");
             return
 
-        with self._busy_cursor():
-            self.status_label.config(text=" Status: Connecting...", image=self.icons['refresh'],
-                                     bootstyle="inverse-info")
-            self.status_icon_key = 'refresh'
-            self.update_idletasks()
-            self.command_queue.put({"action": "connect", "port": port, "unit_id": unit_id, "baudrate": 19200})
+        # The controller thread opens the port and reports back, so there is nothing to wait for here
+        self.status_label.config(text=" Status: Connecting...", image=self.icons['refresh'],
+                                 bootstyle="inverse-info")
+        self.status_icon_key = 'refresh'
+        self._queue_command({"action": "connect", "port": port, "unit_id": unit_id, "baudrate": 19200})
 
     def _disconnect_pump(self):
-        self._send_pump_command("SK")
-        self.command_queue.put({"action": "disconnect"})
+        # Both urgent, so they are sent ahead of any queued speed updates but still in this order
+        self._send_pump_command("SK", urgent=True)
+        self._queue_command({"action": "disconnect"}, urgent=True)
 
     def _update_speed_label_from_scale(self, value):
         rpm = float(value)
@@ -1569,8 +2235,8 @@ class PumpControlUI(tb.Window):
 
     def _manual_start_fwd(self):
         self._set_rpm_from_entry()
-        self._send_pump_command(f"R{int(self.speed_scale.get() * 100):03}")
-        self._send_pump_command("K>")
+        self._send_pump_bytes(CMD_RPM_TMPL % int(self.speed_scale.get() * 100))
+        self._send_pump_bytes(CMD_FORWARD)
         self.fwd_btn.config(bootstyle="primary")  # Visual feedback
         self.rev_btn.config(bootstyle="primary-outline")
         self.current_rpm = float(self.speed_scale.get())
@@ -1578,15 +2244,15 @@ class PumpControlUI(tb.Window):
 
     def _manual_start_rev(self):
         self._set_rpm_from_entry()
-        self._send_pump_command(f"R{int(self.speed_scale.get() * 100):03}")
-        self._send_pump_command("K<")
+        self._send_pump_bytes(CMD_RPM_TMPL % int(self.speed_scale.get() * 100))
+        self._send_pump_bytes(CMD_REVERSE)
         self.rev_btn.config(bootstyle="primary")
         self.fwd_btn.config(bootstyle="primary-outline")
         self.current_rpm = float(self.speed_scale.get())
         self._update_dyn_label(self.current_rpm)
 
     def _manual_stop(self):
-        self._send_pump_command("KH")
+        self._send_pump_bytes(CMD_HALT)
         self.fwd_btn.config(bootstyle="primary-outline")
         self.rev_btn.config(bootstyle="primary-outline")
         self.current_rpm = 0.0
@@ -1598,7 +2264,7 @@ class PumpControlUI(tb.Window):
         if d.result:
             self.sequence_data.append(d.result)
             self._mark_dirty(True)
-            self._update_treeview()
+            self._insert_tree_rows(len(self.sequence_data) - 1, 1)
 
     def _add_cycle(self):
         phases = [i + 1 for i, s in enumerate(self.sequence_data) if s['type'] == 'Phase']
@@ -1606,7 +2272,7 @@ class PumpControlUI(tb.Window):
         if d.result:
             self.sequence_data.append(d.result)
             self._mark_dirty(True)
-            self._update_treeview()
+            self._insert_tree_rows(len(self.sequence_data) - 1, 1)
 
     def _edit_item(self, event=None):
         sel = self.sequence_tree.selection()
@@ -1626,9 +2292,10 @@ class PumpControlUI(tb.Window):
             dialog = AddCycleDialog(self, phases, data)
 
         if dialog and dialog.result:
+            flow_kept = self._adjust_total_duration(idx, data, dialog.result)
             self.sequence_data[idx] = dialog.result
             self._mark_dirty(True)
-            self._update_treeview()
+            self._update_treeview(changed_indices=(idx,), structure_changed=not flow_kept)
             self.sequence_tree.selection_set(self.sequence_tree.get_children()[idx])
 
     def _remove_item(self, event=None):
@@ -1640,7 +2307,7 @@ class PumpControlUI(tb.Window):
             for i in indices:
                 del self.sequence_data[i]
             self._mark_dirty(True)
-            self._update_treeview()
+            self._remove_tree_rows(sel, indices[-1])
 
     def _clear_sequence(self, event=None):
         if self.is_dirty and not self._confirm_unsaved_changes(): return
@@ -1653,31 +2320,33 @@ class PumpControlUI(tb.Window):
         sel = self.sequence_tree.selection()
         if not sel: return
 
-        indices = [self.sequence_tree.index(i) for i in sel]
-        if direction == -1:
-            indices.sort()
-            if indices[0] == 0: return
-            for i in indices:
-                self.sequence_data.insert(i - 1, self.sequence_data.pop(i))
-            new_selection_indices = [i - 1 for i in indices]
-        else:
-            indices.sort(reverse=True)
-            if indices[0] >= len(self.sequence_data) - 1: return
-            for i in indices:
-                self.sequence_data.insert(i + 1, self.sequence_data.pop(i))
-            new_selection_indices = [i + 1 for i in indices]
+        indices = sorted(self.sequence_tree.index(i) for i in sel)
+        if direction == -1 and indices[0] == 0: return
+        if direction == 1:
+            if indices[-1] >= len(self.sequence_data) - 1: return
+            indices.reverse()  # Move the far end first so neighbours don't collide
 
+        # Reorder rows in place with Treeview.move instead of rebuilding the whole tree
+        children = list(self.sequence_tree.get_children())
+        for i in indices:
+            self.sequence_data.insert(i + direction, self.sequence_data.pop(i))
+            children.insert(i + direction, children.pop(i))
+            self.sequence_tree.move(children[i + direction], '', i + direction)
+        lo, hi = min(indices) + min(direction, 0), max(indices) + max(direction, 0)
+        for i in range(lo, hi + 1):  # Only the moved span needs renumbering
+            values, tags = self._render_step(i, self.sequence_data[i])
+            self.sequence_tree.item(children[i], values=values, tags=tags)
+
+        self._step_counts = None  # Cycles refer to steps by position
         self._mark_dirty(True)
-        self._update_treeview()
-
-        new_iids = [self.sequence_tree.get_children()[i] for i in new_selection_indices]
-        self.sequence_tree.selection_set(new_iids)
-        if new_iids: self.sequence_tree.focus(new_iids[0])
+        self._on_sequence_changed()
+        self.sequence_tree.selection_set(sel)
+        self.sequence_tree.focus(sel[0])
 
     def _copy_item(self, event=None):
         sel = self.sequence_tree.selection()
         if not sel: return
-        self.clipboard = [copy.deepcopy(self.sequence_data[self.sequence_tree.index(i)]) for i in sel]
+        self.clipboard = [clone_step(self.sequence_data[self.sequence_tree.index(i)]) for i in sel]
         self._log(f"Copied {len(self.clipboard)} step(s).", "INFO")
         self._update_status_bar(info_text=f"Copied {len(self.clipboard)} step(s)")
 
@@ -1687,9 +2356,9 @@ class PumpControlUI(tb.Window):
         index = self.sequence_tree.index(sel[0]) if sel else len(self.sequence_data) - 1
 
         for item in reversed(self.clipboard):
-            self.sequence_data.insert(index + 1, copy.deepcopy(item))
+            self.sequence_data.insert(index + 1, clone_step(item))
         self._mark_dirty(True)
-        self._update_treeview()
+        self._insert_tree_rows(index + 1, len(self.clipboard))
         self._update_status_bar(info_text=f"Pasted {len(self.clipboard)} step(s)")
 
     def _duplicate_item(self, event=None):
@@ -1710,7 +2379,7 @@ class PumpControlUI(tb.Window):
             self.sequence_data[i]["enabled"] = new_state
 
         self._mark_dirty(True)
-        self._update_treeview()
+        self._update_treeview(changed_indices=indices)
 
     def _batch_edit_items(self):
         sel = self.sequence_tree.selection()
@@ -1724,54 +2393,127 @@ class PumpControlUI(tb.Window):
         dialog = BatchEditDialog(self, len(phase_indices))
         if dialog.result:
             for idx in phase_indices:
+                old = self.sequence_data[idx]
+                self._adjust_total_duration(idx, old, {**old, **dialog.result})
                 for key, value in dialog.result.items():
                     self.sequence_data[idx][key] = value
             self._mark_dirty(True)
-            self._update_treeview()
+            # Batch edits only touch Phase fields outside _FLOW_KEYS
+            self._update_treeview(changed_indices=phase_indices, structure_changed=False)
             self._log(f"Batch edited {len(phase_indices)} phases.", "INFO")
 
-    def _update_treeview(self):
-        selected_iids = self.sequence_tree.selection()
-        self.sequence_tree.delete(*self.sequence_tree.get_children())
-
-        for i, step in enumerate(self.sequence_data):
-            details, duration = "", "N/A"
-            icon = ""
-            is_enabled = step.get("enabled", True)
-
-            if step['type'] == 'Phase':
-                icon = "▶" if step['direction'] == 'Forward' else "◀"
-                details = f"{step['mode']} to {step['rpm']:.2f} RPM"
-                if step['mode'] == 'Ramp': details += f" (interval: {step.get('update_interval', 1.0)}s)"
-                duration = f"{step['duration']} {step['unit']}"
-            elif step['type'] == 'Cycle':
-                icon = "↻"
-                details = f"Loop Phases {step['start_phase']}-{step['end_phase']} ({step['repeats']} times)"
-
-            tags = []
-            if step['type'] == 'Phase':
-                tags.append('forward' if step['direction'] == 'Forward' else 'backward')
-            if not is_enabled:
-                tags.append('disabled')
-
-            self.sequence_tree.insert(
-                "",
-                END,
-                iid=i,
-                values=(i + 1, icon, step['type'], details, duration),
-                tags=tuple(tags),
-            )
+    def _render_step(self, i, step):
+        """ Return the (values, tags) a sequence step is shown with in row i of the tree. """
+        details, duration = "", "N/A"
+        icon = ""
+        is_enabled = step.get("enabled", True)
+
+        if step['type'] == 'Phase':
+            icon = "▶" if step['direction'] == 'Forward' else "◀"
+            details = f"{step['mode']} to {step['rpm']:.2f} RPM"
+            if step['mode'] == 'Ramp': details += f" (interval: {step.get('update_interval', 1.0)}s)"
+            duration = f"{step['duration']} {step['unit']}"
+        elif step['type'] == 'Cycle':
+            icon = "↻"
+            details = f"Loop Phases {step['start_phase']}-{step['end_phase']} ({step['repeats']} times)"
+
+        tags = []
+        if step['type'] == 'Phase':
+            tags.append('forward' if step['direction'] == 'Forward' else 'backward')
+        if not is_enabled:
+            tags.append('disabled')
+        return (i + 1, icon, step['type'], details, duration), tuple(tags)
+
+    def _update_treeview(self, changed_indices=None, structure_changed=True):
+        """ Re-render the rows at changed_indices in place, or rebuild every row when it is None. Pass
+        structure_changed=False only when no step's _FLOW_KEYS changed and the caller has already patched the cached
+        total with _adjust_total_duration. Insertions and removals go through _insert_tree_rows/_remove_tree_rows. """
+        if structure_changed: self._step_counts = None
+        if changed_indices is not None:
+            children = self.sequence_tree.get_children()
+            for i in changed_indices:
+                values, tags = self._render_step(i, self.sequence_data[i])
+                self.sequence_tree.item(children[i], values=values, tags=tags)
+            self._on_sequence_changed()
+            return
 
-        # Restore selection
-        for iid in selected_iids:
-            if self.sequence_tree.exists(iid):
-                self.sequence_tree.selection_add(iid)
+        # Selection is restored by position, since rows are re-created with fresh iids
+        selected_rows = [self.sequence_tree.index(iid) for iid in self.sequence_tree.selection()]
+        # Hide all columns while repopulating so Tk lays the rows out once at the end, not after every insert
+        self.sequence_tree.configure(displaycolumns=())
+        try:
+            self.sequence_tree.delete(*self.sequence_tree.get_children())
+            new_iids = [self.sequence_tree.insert("", END, values=values, tags=tags)
+                        for values, tags in itertools.starmap(self._render_step, enumerate(self.sequence_data))]
+        finally:
+            self.sequence_tree.configure(displaycolumns="#all")
 
+        # Restore selection
+        self.sequence_tree.selection_set([new_iids[i] for i in selected_rows if i < len(new_iids)])
+
+        self._on_sequence_changed()
+
+    def _insert_tree_rows(self, index, count):
+        """ Add rows for sequence_data[index:index + count], already inserted there, without touching the others. """
+        for i in range(index, index + count):
+            values, tags = self._render_step(i, self.sequence_data[i])
+            self.sequence_tree.insert("", i, values=values, tags=tags)
+        self._renumber_rows(index + count)
+        self._step_counts = None
+        self._on_sequence_changed()
+
+    def _remove_tree_rows(self, iids, first_index):
+        """ Drop the rows of steps already deleted from sequence_data; first_index is the lowest removed position. """
+        self.sequence_tree.delete(*iids)
+        self._renumber_rows(first_index)
+        self._step_counts = None
+        self._on_sequence_changed()
+
+    def _tree_children(self):
+        """ Row iids in display order, fetched from Tk once per sequence change (see _on_sequence_changed). """
+        if self._tree_rows is None:
+            self._tree_rows = self.sequence_tree.get_children()
+        return self._tree_rows
+
+    def _focus_row(self, index):
+        """ Select, focus and scroll to the row of step index (the step a running sequence is on). """
+        children = self._tree_children()
+        if index < len(children):
+            iid = children[index]
+            self.sequence_tree.selection_set(iid)
+            self.sequence_tree.focus(iid)
+            self.sequence_tree.see(iid)
+
+    def _renumber_rows(self, start):
+        """ Rows from start on have shifted: only their '#' column needs rewriting. """
+        children = self.sequence_tree.get_children()
+        for i in range(start, len(children)):
+            self.sequence_tree.set(children[i], 0, i + 1)
+
+    def _on_sequence_changed(self):
+        """ Refresh everything derived from sequence_data once the tree rows are up to date. """
+        self._tree_rows = None  # Every row insert, delete, move or rebuild ends up here
+        self._bump_sequence_version()
         self._update_total_duration()
-        if not self.is_running_sequence:
-            self._update_plot()
+        # Redraw the plot once, 150 ms after the last of a burst of edits
+        if self._plot_job: self.after_cancel(self._plot_job)
+        self._plot_job = self.after(150, self._deferred_plot_update)
         self._update_ui_states()
 
+    def _deferred_plot_update(self):
+        self._plot_job = None
+        if self.is_running_sequence: return  # A run draws its own plan background
+        if hasattr(self, 'plot_pane') and not self.plot_pane.winfo_viewable():
+            self._plot_stale = True  # Nobody can see it; redraw once the window is shown again
+            return
+        self._plot_stale = False
+        self._update_plot()
+
+    def _on_window_map(self, event):
+        # Children's <Map> events also reach this binding through the toplevel's bindtag
+        if event.widget is self and self._plot_stale and self._plot_job is None:
+            self._plot_job = self.after_idle(self._deferred_plot_update)
+
     def _update_total_duration(self):
         total_s = self._calculate_total_duration(include_disabled=False)
         duration_str = str(timedelta(seconds=int(total_s)))
@@ -1780,7 +2522,12 @@ class PumpControlUI(tb.Window):
         # Update shear stress based on current rpm
         self._update_dyn_label(self.current_rpm)
 
+    def _bump_sequence_version(self):
+        self._seq_version += 1
+        self._flat_cache.clear()
+
     def _mark_dirty(self, dirty_state):
+        if dirty_state: self._bump_sequence_version()
         self.is_dirty = dirty_state
         filename = os.path.basename(self.current_filepath) if self.current_filepath else "New Sequence"
         suffix = "*" if self.is_dirty else ""
@@ -1800,65 +2547,78 @@ class PumpControlUI(tb.Window):
     def _on_plot_tab_change(self, event=None):
         current = self.plot_tabs.index("current") if hasattr(self, "plot_tabs") else 0
         self.live_track_var.set(current == 1)
-        if not self.is_running_sequence:
+        if self.is_running_sequence: return  # A run keeps both canvases drawn
+        if self._stale_canvases is None:
             self._update_plot()
+            return
+        canvas = (self.canvas_overview, self.canvas_live)[current]
+        if canvas in self._stale_canvases:
+            self._stale_canvases.discard(canvas)
+            canvas.draw()
 
     def _update_plot(self, as_plan_background=False):
         if not hasattr(self, 'ax_overview'): return
         for ax in (self.ax_overview, self.ax_live):
             ax.clear()
-        colors = self.style.colors
-        fwd_color, rev_color = colors.info, colors.danger
+        palette = self._palette
+        fwd_color, rev_color = palette['info'], palette['danger']
+
+        # Each group of segments is one LineCollection per axes instead of a Line2D per step
+        collections_kw = []
 
         # Plot disabled steps in the background
         try:
             disabled_flat_seq = self._flatten_sequence_for_plot(include_disabled=True, only_disabled=True)
-            current_time, current_rpm = 0.0, 0.0
-            for step in disabled_flat_seq:
-                duration_s = step['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(step['unit'], 1))
-                end_t, end_rpm = current_time + duration_s, step['rpm']
-                for ax in (self.ax_overview, self.ax_live):
-                    ax.plot([current_time, end_t], [step['rpm'], end_rpm], color='gray', linestyle=':', linewidth=1)
-                current_time, current_rpm = end_t, end_rpm
+            if disabled_flat_seq:
+                t_start, t_end, _, rpm_end = _step_profile(disabled_flat_seq)
+                segments = np.stack((np.column_stack((t_start, rpm_end)), np.column_stack((t_end, rpm_end))), axis=1)
+                collections_kw.append(dict(segments=segments, colors='gray', linestyles=':', linewidths=1))
         except RecursionError:
             pass  # Ignore if disabled part has loops
 
         # Plot enabled steps
         if as_plan_background:
-            plan_color, plan_style = colors.secondary, '--'
+            plan_color, plan_style = palette['secondary'], '--'
         else:
             for ax in (self.ax_overview, self.ax_live):
                 ax.plot([], [], color=fwd_color, label='Forward', linewidth=2)
                 ax.plot([], [], color=rev_color, label='Backward', linewidth=2)
             plan_style = '-'
 
-        current_time, current_rpm = 0.0, 0.0
         try:
             flat_sequence = self._flatten_sequence_for_plot(include_disabled=False)
-            for step in flat_sequence:
-                duration_s = step['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(step['unit'], 1))
-                plot_color = fwd_color if step['direction'] == 'Forward' else rev_color
-                if as_plan_background: plot_color = plan_color
-
-                start_t, end_t = current_time, current_time + duration_s
-                start_rpm, end_rpm = current_rpm, step['rpm']
-
-                for ax in (self.ax_overview, self.ax_live):
-                    if step['mode'] == 'Fixed':
-                        ax.plot([start_t, start_t], [start_rpm, end_rpm], color=plot_color, linestyle=':',
-                                linewidth=1.5)
-                        ax.plot([start_t, end_t], [end_rpm, end_rpm], color=plot_color, linestyle=plan_style,
-                                linewidth=2)
-                    elif step['mode'] == 'Ramp':
-                        ax.plot([start_t, end_t], [start_rpm, end_rpm], color=plot_color, linestyle=plan_style,
-                                linewidth=2)
-
-                current_rpm, current_time = end_rpm, end_t
+            if flat_sequence:
+                t_start, t_end, rpm_start, rpm_end = _step_profile(flat_sequence)
+                modes = np.array([step['mode'] for step in flat_sequence])
+                fixed, ramp = modes == 'Fixed', modes == 'Ramp'
+                if as_plan_background:
+                    seg_colors = np.full(len(flat_sequence), plan_color, dtype=object)
+                else:
+                    forward = np.array([step['direction'] == 'Forward' for step in flat_sequence])
+                    seg_colors = np.where(forward, fwd_color, rev_color)
+                # Fixed steps jump to their speed (dotted riser) then hold it; ramps go straight from the last speed
+                drawn = fixed | ramp
+                line_start = np.where(fixed, rpm_end, rpm_start)
+                segments = np.stack((np.column_stack((t_start, line_start)), np.column_stack((t_end, rpm_end))),
+                                    axis=1)
+                collections_kw.append(dict(segments=segments[drawn], colors=seg_colors[drawn],
+                                           linestyles=plan_style, linewidths=2))
+                risers = np.stack((np.column_stack((t_start, rpm_start)), np.column_stack((t_start, rpm_end))),
+                                  axis=1)
+                collections_kw.append(dict(segments=risers[fixed], colors=seg_colors[fixed],
+                                           linestyles=':', linewidths=1.5))
         except RecursionError:
             for ax in (self.ax_overview, self.ax_live):
                 ax.text(0.5, 0.5, 'Error: Infinite loop in sequence.', transform=ax.transAxes, color='red',
                         ha='center', va='center')
 
+        collections_kw = [kw for kw in collections_kw if len(kw['segments'])]
+        for ax in (self.ax_overview, self.ax_live):
+            for kw in collections_kw:
+                ax.add_collection(LineCollection(**kw))
+            ax.autoscale_view()
+        self._plan_corners = self.ax_live.dataLim.get_points().copy() if collections_kw else None
+
         for ax, fig in ((self.ax_overview, self.fig_overview), (self.ax_live, self.fig_live)):
             ax.set_xlabel("Time (s)")
             ax.set_ylabel("RPM")
@@ -1866,47 +2626,112 @@ class PumpControlUI(tb.Window):
             if not as_plan_background and (self.sequence_data or self.plot_is_live):
                 legend = ax.legend(prop={'size': self.small_font.cget("size")})
                 for text in legend.get_texts():
-                    text.set_color(colors.fg)
+                    text.set_color(palette['fg'])
                 frame = legend.get_frame()
-                frame.set_facecolor(colors.bg)
-                frame.set_edgecolor(colors.fg)
+                frame.set_facecolor(palette['bg'])
+                frame.set_edgecolor(palette['fg'])
             fig.tight_layout(pad=1.0, h_pad=0.5, w_pad=0.5)
-        self.canvas_overview.draw()
-        self.canvas_live.draw()
-        self._update_plot_style()
-
-    def _update_actual_plot(self, time_pos, rpm_pos, direction):
+        # Style first, then render each figure once (this used to draw, restyle and draw again)
+        self._update_plot_style(redraw=False)
+        canvases = (self.canvas_overview, self.canvas_live)
+        # Only the tab on screen is rendered; the other is drawn when selected. A run blits onto both.
+        shown = canvases if as_plan_background else (canvases[self.plot_tabs.index('current')],)
+        self._stale_canvases = set(canvases).difference(shown)
+        for canvas in shown:
+            canvas.draw()
+
+    def _live_plot_artists(self):
+        """Yields (canvas, ax, line) for the animated 'Actual' lines of the current run."""
+        for canvas, ax, attr in ((self.canvas_overview, self.ax_overview, 'actual_plot_line_overview'),
+                                 (self.canvas_live, self.ax_live, 'actual_plot_line_live')):
+            yield canvas, ax, getattr(self, attr, None)
+
+    def _on_plot_draw(self, event):
+        """Re-captures the blit background after every full redraw and paints the animated line on top."""
+        if not self.plot_is_live:
+            return
+        for canvas, ax, line in self._live_plot_artists():
+            if canvas is event.canvas:
+                self._plot_backgrounds[canvas] = canvas.copy_from_bbox(ax.bbox)
+                if line is not None and line.get_animated() and line in ax.lines:
+                    ax.draw_artist(line)
+
+    def _update_actual_plot(self, samples):
+        """Appends a batch of (time, rpm, direction) samples and repaints the live 'Actual' line once."""
         if not hasattr(self, 'ax_overview') or not self.plot_is_live:
             return
 
-        colors = self.style.colors
-        color = colors.info if direction == 'Forward' else colors.danger
-
-        if direction != self.last_plot_direction:
-            self.last_plot_direction = direction
-            self.actual_plot_data = {"time": [time_pos], "rpm": [rpm_pos]}
-            self.actual_plot_line_overview, = self.ax_overview.plot(
-                self.actual_plot_data["time"], self.actual_plot_data["rpm"],
-                color=color, linewidth=2.5, alpha=0.8, label="Actual")
-            self.actual_plot_line_live, = self.ax_live.plot(
-                self.actual_plot_data["time"], self.actual_plot_data["rpm"],
-                color=color, linewidth=2.5, alpha=0.8, label="Actual")
-        else:
-            self.actual_plot_data["time"].append(time_pos)
-            self.actual_plot_data["rpm"].append(rpm_pos)
-            self.actual_plot_line_overview.set_data(self.actual_plot_data["time"], self.actual_plot_data["rpm"])
-            self.actual_plot_line_live.set_data(self.actual_plot_data["time"], self.actual_plot_data["rpm"])
+        palette = self._palette
+        full_redraw = set()
+
+        for time_pos, rpm_pos, direction in samples:
+            if direction != self.last_plot_direction:
+                self.last_plot_direction = direction
+                # The finished segment becomes part of the static background; only the new one is animated.
+                xs, ys = self._actual_plot_display_data()
+                for _, _, line in self._live_plot_artists():
+                    if line is not None:
+                        line.set_data(xs, ys)
+                        line.set_animated(False)
+                self.actual_plot_data = _SampleBuffer()  # New buffer: finished lines may still reference the old one
+                self.actual_plot_data.append(time_pos, rpm_pos)
+                self._actual_plot_downsampled = None
+                color = palette['info'] if direction == 'Forward' else palette['danger']
+                self.actual_plot_line_overview, = self.ax_overview.plot(
+                    self.actual_plot_data.times, self.actual_plot_data.values,
+                    color=color, linewidth=2.5, alpha=0.8, label="Actual", animated=True)
+                self.actual_plot_line_live, = self.ax_live.plot(
+                    self.actual_plot_data.times, self.actual_plot_data.values,
+                    color=color, linewidth=2.5, alpha=0.8, label="Actual", animated=True)
+                full_redraw.update((self.canvas_overview, self.canvas_live))
+            else:
+                self.actual_plot_data.append(time_pos, rpm_pos)
+
+        xs, ys = self._actual_plot_display_data()
+        self.actual_plot_line_overview.set_data(xs, ys)
+        self.actual_plot_line_live.set_data(xs, ys)
 
+        old_limits = (self.ax_live.get_xlim(), self.ax_live.get_ylim())
         if self.live_track_var.get():
             self.ax_live.set_xlim(self.live_phase_start, self.live_phase_end)
-            self.ax_live.relim()
+            self._relim_live_axes()
             self.ax_live.autoscale_view(scalex=False, scaley=True)
         else:
-            self.ax_live.relim()
+            self._relim_live_axes()
             self.ax_live.autoscale_view()
-
-        for ax in (self.ax_overview, self.ax_live):
-            ax.figure.canvas.draw_idle()
+        if (self.ax_live.get_xlim(), self.ax_live.get_ylim()) != old_limits:
+            full_redraw.add(self.canvas_live)
+
+        for canvas, ax, line in self._live_plot_artists():
+            background = self._plot_backgrounds.get(canvas)
+            if canvas in full_redraw or background is None:
+                # Axis limits changed: re-render once, the draw_event handler refreshes the background
+                self._plot_backgrounds.pop(canvas, None)
+                canvas.draw_idle()
+            else:
+                canvas.restore_region(background)
+                ax.draw_artist(line)
+                canvas.blit(ax.bbox)
+
+    def _relim_live_axes(self):
+        """relim() skips collections on older Matplotlib, so the plan's extent is added back explicitly."""
+        self.ax_live.relim()
+        if self._plan_corners is not None:
+            self.ax_live.update_datalim(self._plan_corners)
+
+    def _actual_plot_display_data(self):
+        """Returns the 'Actual' line data, LTTB-downsampled once the segment grows long."""
+        buf = self.actual_plot_data
+        times, rpms = buf.times, buf.values
+        if len(times) <= LIVE_PLOT_MAX_POINTS:
+            return times, rpms
+        cached = self._actual_plot_downsampled
+        if cached is None or cached[0] != buf.generation or len(times) - cached[1] >= LIVE_PLOT_RESAMPLE_STEP:
+            cached = self._actual_plot_downsampled = (buf.generation, len(times),
+                                                      *lttb_downsample(times, rpms, LIVE_PLOT_MAX_POINTS))
+        # Samples that arrived since the last downsample are appended as-is
+        _, n_src, xs, ys = cached
+        return np.concatenate((xs, times[n_src:])), np.concatenate((ys, rpms[n_src:]))
 
     def _export_plot_image(self):
         if not hasattr(self, 'fig_overview'):
@@ -1939,34 +2764,46 @@ class PumpControlUI(tb.Window):
 
         try:
             flat_sequence = self._flatten_sequence_for_plot(include_disabled=True)
+            rows = []
+            if flat_sequence:
+                _, t_end, _, rpm_end = _step_profile(flat_sequence)
+                # Each step ends where the next starts, so every boundary value is formatted once: step i runs
+                # from times[i] to times[i + 1] and from rpms[i] to rpms[i + 1]
+                times = ["0.00"] + [f"{t:.2f}" for t in t_end.tolist()]
+                rpms = ["0.00"] + [f"{r:.2f}" for r in rpm_end.tolist()]
+                for i, step in enumerate(flat_sequence):
+                    direction, enabled = step['direction'], step.get("enabled", True)
+                    if step['mode'] == 'Ramp':
+                        rows.append((times[i], rpms[i], direction, "Ramp Start", enabled))
+                        rows.append((times[i + 1], rpms[i + 1], direction, "Ramp End", enabled))
+                    else:  # Fixed
+                        rows.append((times[i], rpms[i + 1], direction, "Fixed", enabled))
             with open(fp, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 writer.writerow(['Time (s)', 'Target RPM', 'Direction', 'Mode', 'Enabled'])
-
-                current_time, current_rpm = 0.0, 0.0
-                for step in flat_sequence:
-                    duration_s = step['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(step['unit'], 1))
-                    start_t, end_t = current_time, current_time + duration_s
-                    start_rpm, end_rpm = current_rpm, step['rpm']
-
-                    if step['mode'] == 'Ramp':
-                        writer.writerow([f"{start_t:.2f}", f"{start_rpm:.2f}", step['direction'], "Ramp Start",
-                                         step.get("enabled", True)])
-                        writer.writerow([f"{end_t:.2f}", f"{end_rpm:.2f}", step['direction'], "Ramp End",
-                                         step.get("enabled", True)])
-                    else:  # Fixed
-                        writer.writerow(
-                            [f"{start_t:.2f}", f"{end_rpm:.2f}", step['direction'], "Fixed", step.get("enabled", True)])
-
-                    current_time, current_rpm = end_t, end_rpm
+                writer.writerows(rows)
             self._log(f"Sequence data exported to {fp}", "INFO")
         except Exception as e:
             messagebox.showerror("Export Failed", f"Could not export CSV data: {e}")
 
     def _flatten_sequence_for_plot(self, include_disabled=False, only_disabled=False):
-        flat_list, pc, iterations, cycle_counters, MAX_ITER = [], 0, 0, {}, 10000
-        while pc < len(self.sequence_data) and iterations < MAX_ITER:
-            instr = self.sequence_data[pc]
+        """ Steps in run order; cached until the next edit, so callers must not mutate the returned list. """
+        key = (self._seq_version, include_disabled, only_disabled)
+        flat = self._flat_cache.get(key)
+        if flat is None:
+            flat = [self.sequence_data[pc] for pc in self._sequence_pcs(include_disabled, only_disabled)]
+            self._flat_cache[key] = flat
+        return flat
+
+    def _sequence_pcs(self, include_disabled=False, only_disabled=False):
+        """ Walk the sequence as it would run, returning the index of every Phase executed (cycles expanded).
+        A cycle pass that leaves the other cycles' counters as it found them will repeat identically, so it is walked
+        once and the remaining repeats are appended as copies; MAX_ITER still counts every step they stand for. """
+        steps = self.sequence_data
+        pcs, pc, iterations, cycle_counters, MAX_ITER = [], 0, 0, {}, 10000
+        passes = {}  # Cycle pc -> (len(pcs), iterations, other counters) when its current pass began
+        while pc < len(steps) and iterations < MAX_ITER:
+            instr = steps[pc]
             is_instr_enabled = instr.get("enabled", True)
 
             if only_disabled and is_instr_enabled:
@@ -1977,21 +2814,32 @@ class PumpControlUI(tb.Window):
                 continue
 
             if instr['type'] == 'Phase':
-                flat_list.append(instr)
+                pcs.append(pc)
                 pc += 1
             elif instr['type'] == 'Cycle':
                 if is_instr_enabled:
                     if pc not in cycle_counters: cycle_counters[pc] = instr['repeats']
                     if cycle_counters[pc] > 0:
-                        cycle_counters[pc] -= 1
+                        others = {k: v for k, v in cycle_counters.items() if k != pc}
+                        start = passes.get(pc)
+                        if start is not None and start[2] == others:
+                            remaining = cycle_counters[pc]
+                            iterations += (iterations - start[1]) * remaining
+                            if iterations >= MAX_ITER: break  # Check before copying; huge repeats would exhaust memory
+                            pcs.extend(pcs[start[0]:] * remaining)
+                            cycle_counters[pc] = 0
+                            continue  # Back to this cycle with its counter spent
                         target_pc = instr['start_phase'] - 1
-                        if 0 <= target_pc < len(self.sequence_data):
+                        if 0 <= target_pc < len(steps):
+                            passes[pc] = (len(pcs), iterations, others)
+                            cycle_counters[pc] -= 1
                             pc = target_pc
                         else:
                             self._log(f"Error: Invalid start phase #{instr['start_phase']} in cycle.", "ERROR");
                             break
                     else:
                         del cycle_counters[pc];
+                        passes.pop(pc, None)
                         pc += 1
                 else:  # Disabled cycle, just skip it
                     pc += 1
@@ -1999,7 +2847,7 @@ class PumpControlUI(tb.Window):
         if iterations >= MAX_ITER:
             self._log("Error: Sequence has too many steps or an infinite loop.", "ERROR")
             raise RecursionError("Sequence flattening limit reached")
-        return flat_list
+        return pcs
 
     # --- Sequence Execution ---
     def _run_sequence(self):
@@ -2014,148 +2862,217 @@ class PumpControlUI(tb.Window):
 
         self.plot_is_live = True
         self._update_plot(as_plan_background=True)
-        self.actual_plot_data = {"time": [0], "rpm": [0]}
+        self.actual_plot_data = _SampleBuffer()
+        self.actual_plot_data.append(0.0, 0.0)
         self.last_plot_direction = None
         self.live_phase_start = 0.0
         self.live_phase_end = 0.0
 
         self.stop_event.clear()
-        self.pause_event.clear()
+        self._set_paused(False)
+        self.plot_samples.clear()
         self.sequence_thread = threading.Thread(target=self._sequence_worker, daemon=True)
         self.sequence_thread.start()
+        if self._plot_drain_job is None:
+            self._drain_plot_samples()
+
+    def _drain_plot_samples(self):
+        """ Feeds the samples queued by the sequence worker into the live plot while a run is active. """
+        samples = self.plot_samples
+        if samples:
+            self._update_actual_plot([samples.popleft() for _ in range(len(samples))])
+        self._plot_drain_job = (self.after(LIVE_PLOT_FRAME_MS, self._drain_plot_samples)
+                                if self.is_running_sequence else None)
+
+    def _next_enabled_table(self):
+        """ next_enabled[i] is the first enabled step at or after i (len(sequence_data) if none), so skipping
+        disabled steps is one lookup. """
+        steps = self.sequence_data
+        n_steps = len(steps)
+        next_enabled = [n_steps] * (n_steps + 1)
+        for i in range(n_steps - 1, -1, -1):
+            next_enabled[i] = i if steps[i].get("enabled", True) else next_enabled[i + 1]
+        return next_enabled
 
     def _sequence_worker(self):
         self.current_rpm = 0.0
         pc, cycle_counters = 0, {}
         cumulative_time = 0.0
+        # Steps can still be edited during a run, so the table is rebuilt whenever an edit bumps _seq_version
+        version, next_enabled = None, []
 
-        while pc < len(self.sequence_data) and not self.stop_event.is_set():
-            if self.pause_event.is_set():
-                time.sleep(0.2)
-                continue  # Loop here while paused
-
-            # Find next enabled step
-            while pc < len(self.sequence_data) and not self.sequence_data[pc].get("enabled", True):
-                pc += 1
-            if pc >= len(self.sequence_data): break
-
-            if pc < len(self.sequence_tree.get_children()):
-                self.after(0, lambda p=pc: (
-                    self.sequence_tree.selection_set(self.sequence_tree.get_children()[p]),
-                    self.sequence_tree.focus(self.sequence_tree.get_children()[p]),
-                    self.sequence_tree.see(self.sequence_tree.get_children()[p])
-                ))
-
-            instruction = self.sequence_data[pc]
-            if instruction['type'] == 'Phase':
-                phase_start_time = cumulative_time
-                self.live_phase_start = phase_start_time
-                self.live_phase_end = phase_start_time + (
-                    instruction['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(instruction['unit'], 1))
-                )
-                for time_in_phase, rpm_in_phase, direction in self._execute_phase(instruction):
+        try:
+            while pc < len(self.sequence_data) and not self.stop_event.is_set():
+                if self.pause_event.is_set():
+                    self.resume_event.wait()  # Park here while paused
+                    continue
+
+                if version != self._seq_version:
+                    version, next_enabled = self._seq_version, self._next_enabled_table()
+                if pc >= len(next_enabled) - 1: break  # Shortened by an edit while the table was built
+                pc = next_enabled[pc]
+                if pc >= len(self.sequence_data): break
+
+                self._queue_ui('focus', pc)
+
+                instruction = self.sequence_data[pc]
+                if instruction['type'] == 'Phase':
+                    phase_start_time = cumulative_time
+                    self.live_phase_start = phase_start_time
+                    self.live_phase_end = phase_start_time + _step_seconds(instruction)
+                    for time_in_phase, rpm_in_phase, direction in self._execute_phase(instruction, phase_start_time):
+                        if self.stop_event.is_set(): break
+                        # Pauses are waited out inside _execute_phase, which keeps them out of time_in_phase
+
+                        cumulative_time = phase_start_time + time_in_phase
+                        self.plot_samples.append((cumulative_time, rpm_in_phase, direction))
+                        self.current_rpm = rpm_in_phase
                     if self.stop_event.is_set(): break
-                    pause_start_time = time.time()
-                    while self.pause_event.is_set(): time.sleep(0.1)
-                    if self.is_paused:
-                        phase_start_time += time.time() - pause_start_time
-
-                    cumulative_time = phase_start_time + time_in_phase
-                    self.after(0, self._update_actual_plot, cumulative_time, rpm_in_phase, direction)
-                    self.after(0, self._update_dyn_label, rpm_in_phase)
-                    self.current_rpm = rpm_in_phase
-                if self.stop_event.is_set(): break
-                duration_s = instruction['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(instruction['unit'], 1))
-                cumulative_time = phase_start_time + duration_s
-                pc += 1
-            elif instruction['type'] == 'Cycle':
-                if pc not in cycle_counters: cycle_counters[pc] = instruction['repeats']
-                if cycle_counters[pc] > 0:
-                    cycle_counters[pc] -= 1
-                    pc = instruction['start_phase'] - 1
-                else:
-                    del cycle_counters[pc];
+                    duration_s = _step_seconds(instruction)
+                    cumulative_time = phase_start_time + duration_s
                     pc += 1
+                elif instruction['type'] == 'Cycle':
+                    if pc not in cycle_counters: cycle_counters[pc] = instruction['repeats']
+                    if cycle_counters[pc] > 0:
+                        cycle_counters[pc] -= 1
+                        pc = instruction['start_phase'] - 1
+                    else:
+                        del cycle_counters[pc];
+                        pc += 1
 
-        if not self.stop_event.is_set():
-            self._log("Sequence finished. Stopping pump.", "INFO")
-            self._send_pump_command("KH")
-        self.after(0, self._on_sequence_finish)
+            if not self.stop_event.is_set():
+                self._log("Sequence finished. Stopping pump.", "INFO")
+        except Exception as e:  # e.g. a step removed mid-run; never leave the pump turning with the UI stuck
+            self._log(f"Sequence aborted: {e}", "ERROR")
+        finally:
+            if not self.stop_event.is_set():
+                self._send_pump_bytes(CMD_HALT)
+            self.after(0, self._on_sequence_finish)
 
-    def _execute_phase(self, phase):
+    def _execute_phase(self, phase, time_before_phase):
+        """ Run one Phase on the pump, yielding (time in phase, rpm, direction) each tick. time_before_phase is the
+        planned run time of everything before it, as tracked by the worker. """
         direction, mode = phase['direction'], phase['mode']
-        self._send_pump_command("K>" if direction == 'Forward' else "K<")
-        duration_s = phase['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(phase['unit'], 1))
+        self._send_pump_bytes(CMD_FORWARD if direction == 'Forward' else CMD_REVERSE)
+        duration_s = _step_seconds(phase)
 
-        PROGRESS_INTERVAL, elapsed = 0.1, 0.0
+        # The loop sleeps until its next deadline: a UI tick, a ramp speed update or the end of the phase
+        PROGRESS_INTERVAL, MIN_RPM_INTERVAL, elapsed = 0.25, 0.1, 0.0
         total_duration_global = self._calculate_total_duration(include_disabled=False)
-        time_before_phase = self.actual_plot_data["time"][-1] if self.actual_plot_data["time"] else 0
 
-        start_rpm = self.current_rpm
+        # Everything the loop needs from the phase dict, resolved once per phase rather than once per tick
+        start_rpm, target_rpm = self.current_rpm, phase['rpm']
+        is_ramp = mode == 'Ramp'
+        rpm_per_s = (target_rpm - start_rpm) / duration_s if duration_s > 0 else 0.0
+        update_interval = max(phase.get('update_interval', 1.0), MIN_RPM_INTERVAL)
+        next_rpm_send = update_interval if is_ramp else math.inf  # Phase time at which the ramp speed is next re-sent
+        last_sent = int(start_rpm * 100)  # Pump speed in hundredths of an RPM; the previous phase ended on it
         if mode == 'Fixed':
-            self._send_pump_command(f"R{int(phase['rpm'] * 100):03}")
+            self._send_pump_bytes(CMD_RPM_TMPL % int(target_rpm * 100))
 
+        # Phase time comes from the monotonic clock (immune to wall-clock adjustments) minus time spent paused, so
+        # late wake-ups from wait() do not accumulate into drift
+        current_rpm_in_phase = target_rpm if mode == 'Fixed' else start_rpm
+        phase_t0, paused_s = time.monotonic(), 0.0
         while elapsed < duration_s and not self.stop_event.is_set():
-            pause_start = time.time()
-            self.stop_event.wait(PROGRESS_INTERVAL)
+            self.stop_event.wait(min(PROGRESS_INTERVAL, next_rpm_send - elapsed, duration_s - elapsed))
             if self.pause_event.is_set():
-                time_before_phase += time.time() - pause_start
+                paused_at = time.monotonic()
+                self.resume_event.wait()  # Blocks without waking until resumed or stopped
+                paused_s += time.monotonic() - paused_at
+                last_sent = None  # Pausing halted the pump, so the next ramp update must be sent regardless
                 continue
 
-            elapsed += PROGRESS_INTERVAL
+            elapsed = min(time.monotonic() - phase_t0 - paused_s, duration_s)
 
-            if mode == 'Fixed':
-                current_rpm_in_phase = phase['rpm']
-            elif mode == 'Ramp':
-                update_interval = phase.get('update_interval', 1.0)
-                progress_in_phase = elapsed / duration_s if duration_s > 0 else 1
-                current_rpm_in_phase = start_rpm + (phase['rpm'] - start_rpm) * progress_in_phase
-                if int(elapsed / update_interval) > int((elapsed - PROGRESS_INTERVAL) / update_interval):
-                    self._send_pump_command(f"R{int(current_rpm_in_phase * 100):03}")
+            if is_ramp:
+                current_rpm_in_phase = start_rpm + rpm_per_s * elapsed
+                if elapsed >= next_rpm_send:
+                    speed = int(current_rpm_in_phase * 100)
+                    if speed != last_sent:  # Slow ramps often land on the same value; don't resend it
+                        self._send_pump_bytes(CMD_RPM_TMPL % speed)
+                        last_sent = speed
+                    next_rpm_send += update_interval * (int((elapsed - next_rpm_send) / update_interval) + 1)
 
             yield elapsed, current_rpm_in_phase, direction
             self._update_progress_bars(elapsed, duration_s, time_before_phase, total_duration_global)
-            self.after(0, self._update_dyn_label, current_rpm_in_phase)
+            self._queue_ui('dyn', current_rpm_in_phase)
 
-        if not self.stop_event.is_set(): self._send_pump_command(f"R{int(phase['rpm'] * 100):03}")
+        if not self.stop_event.is_set(): self._send_pump_bytes(CMD_RPM_TMPL % int(target_rpm * 100))
 
     def _update_progress_bars(self, elapsed_step, duration_step, time_before, duration_total):
+        self._queue_ui('progress', (elapsed_step, duration_step, time_before, duration_total))
+
+    def _apply_progress(self, elapsed_step, duration_step, time_before, duration_total):
         step_prog = (elapsed_step / duration_step) * 100 if duration_step > 0 else 100
         total_prog = ((time_before + elapsed_step) / duration_total) * 100 if duration_total > 0 else 100
 
         elapsed_str = str(timedelta(seconds=int(elapsed_step)))
         duration_str = str(timedelta(seconds=int(duration_step)))
 
-        def _update():
-            if not self.winfo_exists(): return
-            self.step_progress.config(value=step_prog)
-            self.total_progress.config(value=total_prog)
-            self.step_time_label.config(text=f"Step time: {elapsed_str} / {duration_str}")
-            remaining_total = max(0, duration_total - (time_before + elapsed_step))
-            total_str = str(timedelta(seconds=int(duration_total)))
-            remaining_str = str(timedelta(seconds=int(remaining_total)))
-            self.total_duration_label.config(text=f"Total: {remaining_str} / {total_str}")
-
-        self.after(0, _update)
+        self.step_progress.config(value=step_prog)
+        self.total_progress.config(value=total_prog)
+        self.step_time_label.config(text=f"Step time: {elapsed_str} / {duration_str}")
+        remaining_total = max(0, duration_total - (time_before + elapsed_step))
+        total_str = str(timedelta(seconds=int(duration_total)))
+        remaining_str = str(timedelta(seconds=int(remaining_total)))
+        self.total_duration_label.config(text=f"Total: {remaining_str} / {total_str}")
+
+    def _queue_ui(self, kind, payload):
+        """ Worker-thread side of the UI batch: keep only the newest payload per kind and make sure one flush is
+        scheduled. dict item assignment is atomic, and the flag is cleared before the flush reads the dict. """
+        self._ui_pending[kind] = payload
+        if not self._ui_flush_scheduled:
+            self._ui_flush_scheduled = True
+            self.after(UI_FLUSH_MS, self._flush_ui)
+
+    def _flush_ui(self):
+        """ Apply everything the sequence worker queued since the last flush in one Tk callback. """
+        self._ui_flush_scheduled = False
+        if not self.winfo_exists(): return
+        pending = self._ui_pending
+        for kind in list(pending):
+            payload = pending.pop(kind)
+            if kind == 'progress':
+                self._apply_progress(*payload)
+            elif kind == 'dyn':
+                self._update_dyn_label(payload)
+            elif kind == 'focus':
+                self._focus_row(payload)
 
     def _calculate_total_duration(self, include_disabled=False):
+        if not include_disabled:
+            self._ensure_step_counts()
+            return self._total_duration_s
         try:
-            return sum(s['duration'] * ({'s': 1, 'min': 60, 'hr': 3600}.get(s['unit'], 1)) for s in
-                       self._flatten_sequence_for_plot(include_disabled=include_disabled))
+            return sum(map(_step_seconds, self._flatten_sequence_for_plot(include_disabled=include_disabled)))
         except RecursionError:
             return 0
 
-    def _calculate_shear_stress(self, rpm):
+    def _ensure_step_counts(self):
+        """ (Re)compute how often each enabled step runs and the resulting total, after a structural edit. """
+        if self._step_counts is not None: return
         try:
-            eta = float(self.settings.get("dynamic_viscosity", DEFAULT_VISCOSITY))
-            p_const = float(self.settings.get(
-                "chamber_p_value",
-                CHAMBER_COEFFICIENTS.get(self.settings.get("chamber_type", DEFAULT_CHAMBER), 176.1),
-            ))
-            k_coeff = float(self.settings.get("tube_coefficient", DEFAULT_TUBE_COEFFICIENT))
-            return eta * p_const * (k_coeff * rpm)
-        except Exception:
-            return None
+            self._step_counts = collections.Counter(self._sequence_pcs(include_disabled=False))
+        except RecursionError:
+            self._step_counts = collections.Counter()
+        steps = self.sequence_data
+        self._total_duration_s = sum(n * _step_seconds(steps[pc]) for pc, n in self._step_counts.items())
+
+    def _adjust_total_duration(self, index, old_step, new_step):
+        """ Patch the cached total for an in-place edit of one step. Returns False when the edit changes execution
+        order (any of _FLOW_KEYS), in which case the caller must let the counts be recomputed. """
+        if any(old_step.get(k, True) != new_step.get(k, True) for k in _FLOW_KEYS): return False
+        if self._step_counts is None: return True  # Nothing cached yet; the next read computes from scratch
+        n = self._step_counts.get(index, 0)
+        if n and new_step['type'] == 'Phase':
+            self._total_duration_s += n * (_step_seconds(new_step) - _step_seconds(old_step))
+        return True
+
+    def _calculate_shear_stress(self, rpm):
+        """ Shear stress in dyn/cm² for a scalar rpm or a NumPy array of rpm values. """
+        factor = self._shear_factor  # Scalar factors are folded once per settings change
+        return None if factor is None else factor * rpm
 
     def _update_dyn_label(self, rpm):
         tau = self._calculate_shear_stress(rpm)
@@ -2165,6 +3082,7 @@ class PumpControlUI(tb.Window):
             self.dyn_label.config(text=f"Dyn: {tau:.2f} dyn/cm²")
 
     def _on_sequence_finish(self):
+        self._ui_pending.clear()  # A late progress flush must not refill the bars reset below
         self.is_running_sequence = False
         self.is_paused = False
         self.plot_is_live = False
@@ -2181,23 +3099,34 @@ class PumpControlUI(tb.Window):
     def _pause_resume_sequence(self):
         self.is_paused = not self.is_paused
         if self.is_paused:
-            self.pause_event.set()
-            self._send_pump_command("KH")  # Halt pump on pause
+            # Pause before halting: halting first would let a ramp update queued in between restart the pump.
+            # The halt is not urgent, so FIFO order keeps it behind any update the worker has already queued.
+            self._set_paused(True)
+            self._send_pump_bytes(CMD_HALT)  # Halt pump on pause
             self.pause_seq_btn.config(text=" Resume", image=self.icons['play'])
             self._log("Sequence paused.", "INFO")
             self.current_rpm = 0.0
             self._update_dyn_label(0.0)
         else:
-            self.pause_event.clear()
             self.pause_seq_btn.config(text=" Pause", image=self.icons['pause'])
             self._log("Sequence resumed.", "INFO")
+            self._set_paused(False)  # Last, so the worker wakes to the final state
+
+    def _set_paused(self, paused):
+        """ Flip pause_event and its complement resume_event together; the worker waits on the latter. """
+        if paused:
+            self.resume_event.clear()
+            self.pause_event.set()
+        else:
+            self.pause_event.clear()
+            self.resume_event.set()
 
     def _stop_sequence(self):
         if self.sequence_thread and self.sequence_thread.is_alive():
             self._log("STOP pressed. Halting pump and sequence...", "INFO")
-            self._send_pump_command("KH")
-            self.stop_event.set()
-            self.pause_event.clear()
+            self.stop_event.set()  # Before the halt, as in pause: a ramp update queued after KH would restart the pump
+            self._send_pump_bytes(CMD_HALT)
+            self._set_paused(False)  # Also wakes a worker parked in resume_event.wait()
             self.current_rpm = 0.0
             self._update_dyn_label(0.0)
 
@@ -2220,8 +3149,8 @@ class PumpControlUI(tb.Window):
     def _load_sequence(self, filepath):
         if not self._confirm_unsaved_changes(): return
         try:
-            with self._busy_cursor(), open(filepath, 'r', encoding='utf-8') as f:
-                self.sequence_data = json.load(f)
+            with self._busy_cursor():
+                self.sequence_data = load_sequence_file(filepath)
             self.current_filepath = filepath
             self._update_treeview()
             self._log(f"Sequence loaded from: {filepath}", "INFO")
@@ -2237,8 +3166,8 @@ class PumpControlUI(tb.Window):
         if not self.current_filepath:
             return self._save_sequence_as()
         try:
-            with self._busy_cursor(), open(self.current_filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.sequence_data, f, indent=4)
+            with self._busy_cursor():
+                save_json(self.current_filepath, self.sequence_data, pretty=True)
             self._log(f"Sequence saved to: {self.current_filepath}", "INFO")
             self._mark_dirty(False)
             self._add_to_recent_files(self.current_filepath)
@@ -2268,7 +3197,7 @@ class PumpControlUI(tb.Window):
             if not messagebox.askyesno("Overwrite?", f"Template '{template_name}' already exists. Overwrite?"):
                 return
 
-        template_data = [copy.deepcopy(self.sequence_data[self.sequence_tree.index(i)]) for i in sel]
+        template_data = [clone_step(self.sequence_data[self.sequence_tree.index(i)]) for i in sel]
         if "templates" not in self.settings:
             self.settings["templates"] = {}
         self.settings["templates"][template_name] = template_data
@@ -2284,10 +3213,10 @@ class PumpControlUI(tb.Window):
         index = self.sequence_tree.index(sel[0]) if sel else len(self.sequence_data) - 1
 
         for item in reversed(template_data):
-            self.sequence_data.insert(index + 1, copy.deepcopy(item))
+            self.sequence_data.insert(index + 1, clone_step(item))
 
         self._mark_dirty(True)
-        self._update_treeview()
+        self._insert_tree_rows(index + 1, len(template_data))
         self._log(f"Inserted template '{name}'.", "INFO")
 
     # --- Application Shutdown ---
@@ -2296,18 +3225,25 @@ class PumpControlUI(tb.Window):
             return
 
         if self.is_connected: self._disconnect_pump()
-        self.command_queue.put({"action": "stop_thread"})
+        # Stop the controller's cross-thread event_generate calls; they would block until the join below times out
+        self.pump_controller._ui_ref = None
+        self._queue_command({"action": "stop_thread"}, urgent=True)
         self.stop_event.set()
+        self._set_paused(False)  # Let a paused sequence thread see the stop
 
         if self.sequence_thread: self.sequence_thread.join(timeout=0.2)
         self.controller_thread.join(timeout=0.5)
 
         if self.autosave_timer_id: self.after_cancel(self.autosave_timer_id)
+        if self._autosave_thread: self._autosave_thread.join(timeout=1.0)  # Don't let a late write recreate the backup
         # Clean up backup file on successful exit
         with contextlib.suppress(OSError):
             if os.path.exists(BACKUP_FILE):
                 os.remove(BACKUP_FILE)
 
+        # Window resizes move the sashes without a <ButtonRelease-1>, so take the final positions once here
+        for name, pane in (("main_pane", self.main_pane), ("right_pane", self.right_pane)):
+            self._remember_sash(name, pane)
         self._save_settings()
         self.destroy()
 